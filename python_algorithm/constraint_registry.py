@@ -0,0 +1,313 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import List, Dict, Tuple, Any, Optional, FrozenSet
+
+from utils import count_student_clashes, MINUTES_PER_DAY
+
+# (detail key as reported in soft_constraints_details, violation count, penalty contribution)
+ConstraintBreakdownEntry = Tuple[str, float, float]
+
+
+def _violates_time_of_day_preference(pref_time_of_day: str, start_minute_of_day: int) -> bool:
+    if pref_time_of_day == "morning": return start_minute_of_day >= 12 * 60
+    if pref_time_of_day == "afternoon": return start_minute_of_day < 12 * 60 or start_minute_of_day >= 17 * 60 + 30
+    if pref_time_of_day == "no_early_morning": return start_minute_of_day < 9 * 60
+    if pref_time_of_day == "no_late_evening": return start_minute_of_day >= 17 * 60
+    return False
+
+
+class ScheduleEvaluationPass:
+    """Facts about one chromosome that several constraints read; each is computed at most once per pass."""
+
+    def __init__(self, scheduler, chromosome):
+        self.scheduler = scheduler
+        self.chromosome = chromosome
+        self._placed_timeslot_ids: Optional[List[int]] = None
+        self._lecturer_events: Optional[Tuple[Dict[int, int], Dict[int, List[Tuple[int, int, int]]]]] = None
+
+    def placed_timeslot_ids(self) -> List[int]:
+        if self._placed_timeslot_ids is None:
+            self._placed_timeslot_ids = self.scheduler._placed_timeslot_ids(self.chromosome.timeslots)
+        return self._placed_timeslot_ids
+
+    def lecturer_events(self) -> Tuple[Dict[int, int], Dict[int, List[Tuple[int, int, int]]]]:
+        """Periods taught per lecturer, and per lecturer the (start, end, day) of events sorted by start minute."""
+        if self._lecturer_events is None:
+            ga = self.scheduler
+            chromosome = self.chromosome
+            lecturer_periods_taught: Dict[int, int] = defaultdict(int)
+            lecturer_event_times: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+            for item_pos, mapped_ts_id in enumerate(chromosome.timeslots):
+                mapped_lect_id = chromosome.lecturers[item_pos]
+                required_periods = ga.item_required_periods[item_pos]
+                if mapped_ts_id < 0 or mapped_lect_id < 0 or required_periods is None: continue
+                if mapped_ts_id not in ga.timeslots_data_mapped: continue
+                lecturer_periods_taught[mapped_lect_id] += required_periods
+                if ga.timeslot_start_minutes[mapped_ts_id] >= 0 and ga.timeslot_end_minutes[mapped_ts_id] >= 0:
+                    lecturer_event_times[mapped_lect_id].append(
+                        (ga.timeslot_start_minutes[mapped_ts_id], ga.timeslot_end_minutes[mapped_ts_id], ga.timeslot_day_indices[mapped_ts_id]))
+            for events_list in lecturer_event_times.values():
+                events_list.sort(key=lambda event_times: event_times[0])
+            self._lecturer_events = (lecturer_periods_taught, lecturer_event_times)
+        return self._lecturer_events
+
+
+class ConstraintEvaluator(ABC):
+    """One constraint, built once per scheduler. evaluate() returns breakdown entries for non-zero violations only."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def applies(self) -> bool:
+        return True
+
+    @abstractmethod
+    def evaluate(self, evaluation_pass: ScheduleEvaluationPass) -> List[ConstraintBreakdownEntry]:
+        ...
+
+
+class HardConstraintsEvaluator(ConstraintEvaluator):
+    """Missing lecturer/room, lecturer and room double booking, lecturer unavailability, room capacity, student self-clash."""
+
+    def is_satisfied(self, chromosome) -> bool:
+        ga = self.scheduler
+        if not chromosome: return True
+
+        lecturer_occupied_slots = set()
+        classroom_occupied_slots = set()
+        student_self_clash_ts_ids = set()
+        check_student_self_clash = ga.run_type == "student_schedule_request"
+
+        for item_pos, mapped_ts_id in enumerate(chromosome.timeslots):
+            if mapped_ts_id < 0: continue
+            mapped_lect_id = chromosome.lecturers[item_pos]
+            mapped_room_id = chromosome.rooms[item_pos]
+            if mapped_lect_id < 0 or mapped_room_id < 0: return False
+
+            if (mapped_lect_id, mapped_ts_id) in lecturer_occupied_slots: return False
+            lecturer_occupied_slots.add((mapped_lect_id, mapped_ts_id))
+
+            if (mapped_room_id, mapped_ts_id) in classroom_occupied_slots: return False
+            classroom_occupied_slots.add((mapped_room_id, mapped_ts_id))
+
+            if mapped_ts_id in ga.lecturer_unavailable_ts_ids.get(mapped_lect_id, ()):
+                return False
+
+            num_stud = ga.item_num_students[item_pos]
+            if num_stud > 0 and mapped_room_id in ga.room_capacity_by_mapped_id and num_stud > ga.room_capacity_by_mapped_id[mapped_room_id]:
+                return False
+
+            if check_student_self_clash:
+                if mapped_ts_id in student_self_clash_ts_ids: return False
+                student_self_clash_ts_ids.add(mapped_ts_id)
+        return True
+
+    def evaluate(self, evaluation_pass: ScheduleEvaluationPass) -> List[ConstraintBreakdownEntry]:
+        if self.is_satisfied(evaluation_pass.chromosome): return []
+        return [("HCV_Overall_Applied", 1, self.scheduler.penalty_hard_constraint_violation)]
+
+
+class StudentClashEvaluator(ConstraintEvaluator):
+    def applies(self) -> bool:
+        return self.scheduler.run_type == "admin_optimize_semester" and bool(self.scheduler.course_pair_shared_students)
+
+    def evaluate(self, evaluation_pass: ScheduleEvaluationPass) -> List[ConstraintBreakdownEntry]:
+        ga = self.scheduler
+        student_clash_placements = [
+            (ga.item_course_ids[item_pos], mapped_ts_id)
+            for item_pos, mapped_ts_id in enumerate(evaluation_pass.chromosome.timeslots) if mapped_ts_id >= 0
+        ]
+        clash_count = count_student_clashes(student_clash_placements, ga.course_pair_shared_students, ga.overlapping_timeslot_ids)
+        return [("student_clash_admin", clash_count, clash_count * ga.penalty_student_clash)] if clash_count > 0 else []
+
+
+class LecturerLoadEvaluator(ConstraintEvaluator):
+    def evaluate(self, evaluation_pass: ScheduleEvaluationPass) -> List[ConstraintBreakdownEntry]:
+        ga = self.scheduler
+        lecturer_periods_taught, _ = evaluation_pass.lecturer_events()
+        overload_units = sum(max(0, periods - ga.lecturer_max_periods) for periods in lecturer_periods_taught.values())
+        underload_units = sum(max(0, ga.lecturer_min_periods - periods) for periods in lecturer_periods_taught.values())
+        breakdown: List[ConstraintBreakdownEntry] = []
+        if overload_units > 0: breakdown.append(("lecturer_overload", overload_units, overload_units * ga.penalty_lecturer_overload))
+        if underload_units > 0: breakdown.append(("lecturer_underload", underload_units, underload_units * ga.penalty_lecturer_underload))
+        return breakdown
+
+
+class LecturerBreakEvaluator(ConstraintEvaluator):
+    def evaluate(self, evaluation_pass: ScheduleEvaluationPass) -> List[ConstraintBreakdownEntry]:
+        ga = self.scheduler
+        _, lecturer_event_times = evaluation_pass.lecturer_events()
+        insufficient_break_count = 0
+        for events_list in lecturer_event_times.values():
+            for i_br in range(len(events_list) - 1):
+                event1_start, event1_end, event1_day = events_list[i_br]
+                event2_start, event2_end, event2_day = events_list[i_br + 1]
+                if event1_day == event2_day and event2_start >= event1_end and 0 <= event2_start - event1_end < ga.lecturer_min_break_minutes:
+                    insufficient_break_count += 1
+        if not insufficient_break_count: return []
+        return [("lecturer_insufficient_break", insufficient_break_count, insufficient_break_count * ga.penalty_lecturer_insufficient_break)]
+
+
+class ClassroomFillEvaluator(ConstraintEvaluator):
+    """Room under-use; the penalty of every (item, room) pairing is tabulated once, so a pass is one lookup per event."""
+
+    def __init__(self, scheduler):
+        super().__init__(scheduler)
+        ga = scheduler
+        self.fill_entries_by_item: List[Dict[int, Tuple[bool, float]]] = []
+        for num_students in ga.item_num_students:
+            fill_entries: Dict[int, Tuple[bool, float]] = {}
+            for room_id, room_capacity in ga.room_capacity_by_mapped_id.items():
+                if num_students <= 0 or room_capacity <= 0: continue
+                fill_ratio = num_students / room_capacity
+                if fill_ratio < (ga.target_classroom_fill_ratio_min * 0.5):
+                    fill_entries[room_id] = (True, ga.penalty_classroom_underutilized)
+                elif fill_ratio < ga.target_classroom_fill_ratio_min:
+                    fill_entries[room_id] = (False, ga.penalty_classroom_slightly_empty * (ga.target_classroom_fill_ratio_min - fill_ratio) *
+                                             ga.classroom_slightly_empty_multiplier)
+            self.fill_entries_by_item.append(fill_entries)
+
+    def evaluate(self, evaluation_pass: ScheduleEvaluationPass) -> List[ConstraintBreakdownEntry]:
+        chromosome = evaluation_pass.chromosome
+        severe_count = slight_count = 0
+        severe_penalty = slight_penalty = 0.0
+        for item_pos, mapped_room_id in enumerate(chromosome.rooms):
+            if chromosome.timeslots[item_pos] < 0 or mapped_room_id < 0: continue
+            fill_entry = self.fill_entries_by_item[item_pos].get(mapped_room_id)
+            if fill_entry is None: continue
+            if fill_entry[0]:
+                severe_count += 1; severe_penalty += fill_entry[1]
+            else:
+                slight_count += 1; slight_penalty += fill_entry[1]
+        breakdown: List[ConstraintBreakdownEntry] = []
+        if severe_count > 0: breakdown.append(("classroom_severely_underutilized", severe_count, severe_penalty))
+        if slight_count > 0: breakdown.append(("classroom_slightly_empty", slight_count, slight_penalty))
+        return breakdown
+
+
+class StudentPreferenceEvaluator(ConstraintEvaluator):
+    """Student preferences, scored from per-timeslot flags and a slot x slot back-to-back table built once per run."""
+
+    def __init__(self, scheduler):
+        super().__init__(scheduler)
+        ga = scheduler
+        preferences = ga.student_preferences or {}
+        self.pref_time_of_day = preferences.get("time_of_day") or None
+        max_consecutive_pref_str = preferences.get("max_consecutive_classes")
+        self.max_allowed_consecutive = int(max_consecutive_pref_str) \
+            if max_consecutive_pref_str and str(max_consecutive_pref_str).isdigit() and int(max_consecutive_pref_str) > 0 else None
+        self.max_consecutive_gap = ga.data.get("settings", {}).get("break_duration_minutes", 5) + 10
+        self.friday_off = bool(preferences.get("friday_off", False))
+        default_target_max_days = ga.data.get("settings", {}).get("student_max_study_days_per_week", 3)
+        self.target_max_days = int(preferences.get("target_max_days", default_target_max_days)) if preferences.get("compact_days", False) else 0
+
+        self.violates_time_of_day = bytearray(len(ga.timeslot_start_minutes))
+        self.is_friday = bytearray(len(ga.timeslot_start_minutes))
+        self.has_times = bytearray(len(ga.timeslot_start_minutes))
+        # Per slot: the slots of the same day that count as back-to-back after it (next start within the gap of its end).
+        self.back_to_back_ts_ids: List[FrozenSet[int]] = [frozenset()] * len(ga.timeslot_start_minutes)
+        if self.applies(): self._build_timeslot_tables()
+
+    def _build_timeslot_tables(self):
+        ga = self.scheduler
+        timed_ts_ids_by_day: Dict[int, List[int]] = defaultdict(list)
+        for ts_id in ga.all_mapped_ts_ids:
+            start_minute, end_minute = ga.timeslot_start_minutes[ts_id], ga.timeslot_end_minutes[ts_id]
+            if self.pref_time_of_day and start_minute >= 0:
+                self.violates_time_of_day[ts_id] = _violates_time_of_day_preference(self.pref_time_of_day, start_minute % MINUTES_PER_DAY)
+            self.is_friday[ts_id] = ga.timeslot_day_indices[ts_id] == 4
+            if start_minute >= 0 and end_minute >= 0:
+                self.has_times[ts_id] = 1
+                timed_ts_ids_by_day[ga.timeslot_day_indices[ts_id]].append(ts_id)
+        if not self.max_allowed_consecutive: return
+        for day_ts_ids in timed_ts_ids_by_day.values():
+            for ts_id in day_ts_ids:
+                self.back_to_back_ts_ids[ts_id] = frozenset(
+                    other_ts_id for other_ts_id in day_ts_ids
+                    if ga.timeslot_start_minutes[other_ts_id] - ga.timeslot_end_minutes[ts_id] <= self.max_consecutive_gap
+                )
+
+    def applies(self) -> bool:
+        return self.scheduler.run_type == "student_schedule_request" and bool(self.scheduler.student_preferences)
+
+    def _count_consecutive_violations(self, placed_ts_ids: List[int]) -> int:
+        ga = self.scheduler
+        events_by_day: Dict[int, List[int]] = defaultdict(list)
+        for mapped_ts_id in placed_ts_ids:
+            if self.has_times[mapped_ts_id]: events_by_day[ga.timeslot_day_indices[mapped_ts_id]].append(mapped_ts_id)
+
+        total_consecutive_violations = 0
+        for day_ts_ids in events_by_day.values():
+            if len(day_ts_ids) <= self.max_allowed_consecutive: continue
+            day_ts_ids.sort(key=ga.timeslot_start_minutes.__getitem__)
+            current_consecutive_count = 1
+            for previous_ts_id, mapped_ts_id in zip(day_ts_ids, day_ts_ids[1:]):
+                if mapped_ts_id in self.back_to_back_ts_ids[previous_ts_id]:
+                    current_consecutive_count += 1
+                    continue
+                if current_consecutive_count > self.max_allowed_consecutive:
+                    total_consecutive_violations += current_consecutive_count - self.max_allowed_consecutive
+                current_consecutive_count = 1
+            if current_consecutive_count > self.max_allowed_consecutive:
+                total_consecutive_violations += current_consecutive_count - self.max_allowed_consecutive
+        return total_consecutive_violations
+
+    def breakdown_for_timeslots(self, placed_ts_ids: List[int]) -> List[ConstraintBreakdownEntry]:
+        ga = self.scheduler
+        penalty_per_violation = ga.penalty_student_preference_violation
+        breakdown: List[ConstraintBreakdownEntry] = []
+        if self.pref_time_of_day:
+            time_of_day_violations = sum(self.violates_time_of_day[ts_id] for ts_id in placed_ts_ids)
+            if time_of_day_violations > 0:
+                breakdown.append(("student_pref_time_of_day", time_of_day_violations, time_of_day_violations * penalty_per_violation))
+        if self.max_allowed_consecutive:
+            consecutive_violations = self._count_consecutive_violations(placed_ts_ids)
+            if consecutive_violations > 0:
+                breakdown.append(("student_pref_max_consecutive", consecutive_violations, consecutive_violations * penalty_per_violation))
+        if self.friday_off:
+            friday_class_count = sum(self.is_friday[ts_id] for ts_id in placed_ts_ids)
+            # Friday-off is one violated wish, however many Friday classes there are.
+            if friday_class_count > 0: breakdown.append(("student_pref_friday_off", friday_class_count, penalty_per_violation))
+        if self.target_max_days > 0:
+            days_with_classes = {ga.timeslot_day_indices[ts_id] for ts_id in placed_ts_ids if ga.timeslot_day_indices[ts_id] >= 0}
+            days_over_target = len(days_with_classes) - self.target_max_days
+            if days_over_target > 0:
+                breakdown.append(("student_pref_compact_days", days_over_target, days_over_target * penalty_per_violation))
+        return breakdown
+
+    def evaluate(self, evaluation_pass: ScheduleEvaluationPass) -> List[ConstraintBreakdownEntry]:
+        return self.breakdown_for_timeslots(evaluation_pass.placed_timeslot_ids())
+
+
+class ConstraintRegistry:
+    """All hard and soft constraints for one scheduler; one pass yields the penalty and the per-constraint breakdown."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.hard_constraints = HardConstraintsEvaluator(scheduler)
+        self.student_preferences = StudentPreferenceEvaluator(scheduler)
+        candidate_soft_constraints: List[ConstraintEvaluator] = [
+            StudentClashEvaluator(scheduler), LecturerLoadEvaluator(scheduler), LecturerBreakEvaluator(scheduler),
+            ClassroomFillEvaluator(scheduler), self.student_preferences
+        ]
+        self.soft_constraints = [evaluator for evaluator in candidate_soft_constraints if evaluator.applies()]
+
+    def evaluate(self, chromosome, stop_at_hard_violation: bool = True) -> Tuple[float, bool, List[ConstraintBreakdownEntry]]:
+        """(total penalty, hard-valid, breakdown). Without the violation allowance a hard violation scores inf;
+        stop_at_hard_violation=False still fills the soft breakdown for reporting."""
+        ga = self.scheduler
+        evaluation_pass = ScheduleEvaluationPass(ga, chromosome)
+        hard_breakdown = self.hard_constraints.evaluate(evaluation_pass)
+        is_hard_valid = not hard_breakdown
+        breakdown: List[ConstraintBreakdownEntry] = []
+        if not is_hard_valid:
+            if not ga.allow_hard_constraint_violations_in_ga and stop_at_hard_violation:
+                return float('inf'), False, breakdown
+            if ga.allow_hard_constraint_violations_in_ga:
+                breakdown.extend(hard_breakdown)
+
+        for evaluator in self.soft_constraints:
+            breakdown.extend(evaluator.evaluate(evaluation_pass))
+        total_penalty = sum(penalty for _, _, penalty in breakdown)
+        if not is_hard_valid and not ga.allow_hard_constraint_violations_in_ga: total_penalty = float('inf')
+        return total_penalty, is_hard_valid, breakdown
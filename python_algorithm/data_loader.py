@@ -1,396 +1,724 @@
-import mysql.connector
-from datetime import datetime, timedelta, time as dt_time
-from typing import List, Dict, Tuple, Set, Optional
-import uuid
-
-from models import (
-    TimeSlot, Classroom, Instructor, Course, Student, ScheduledClass,
-    Schedule, SchedulingMetrics, SchedulingResult
-)
-
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'dss'
-}
-
-def get_db_connection():
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except mysql.connector.Error as err:
-        print(f"DATA_LOADER ERROR: Database connection failed: {err}")
-        return None
-
-def string_to_time(time_str: any) -> Optional[dt_time]:
-    if isinstance(time_str, dt_time):
-        return time_str
-    if isinstance(time_str, timedelta):
-        return (datetime.min + time_str).time()
-    if not isinstance(time_str, str):
-        return None
-    try:
-        return datetime.strptime(time_str, '%H:%M:%S').time()
-    except ValueError:
-        try:
-            return datetime.strptime(time_str, '%H:%M').time()
-        except ValueError:
-            return None
-
-def check_time_overlap(slot_start: Optional[dt_time], slot_end: Optional[dt_time],
-                       busy_start: Optional[dt_time], busy_end: Optional[dt_time]) -> bool:
-    if not all(isinstance(t, dt_time) for t in [slot_start, slot_end, busy_start, busy_end]):
-        return False
-    if slot_start >= slot_end or busy_start >= busy_end:
-        return False
-    return max(slot_start, busy_start) < min(slot_end, busy_end)
-
-
-def load_all_data(semester_id_to_load: int) -> Tuple[
-    List[ScheduledClass], List[Instructor], List[Classroom], List[TimeSlot], List[Student], Dict[str, Course]
-]:
-    conn = get_db_connection()
-    empty_return = [], [], [], [], [], {}
-    if not conn:
-        return empty_return
-
-    cursor = None
-    print(f"DATA_LOADER INFO: Starting data load for SemesterID: {semester_id_to_load}.")
-    try:
-        cursor = conn.cursor(dictionary=True)
-
-        query_semester = "SELECT SemesterName FROM Semesters WHERE SemesterID = %s"
-        cursor.execute(query_semester, (semester_id_to_load,))
-        semester_row = cursor.fetchone()
-        if not semester_row:
-            print(f"DATA_LOADER ERROR: SemesterID {semester_id_to_load} not found.")
-            return empty_return
-        print(f"DATA_LOADER INFO: Confirmed Semester: {semester_row['SemesterName']} (ID: {semester_id_to_load}).")
-
-        print("DATA_LOADER INFO: Loading TimeSlots...")
-        query_timeslots = "SELECT TimeSlotID, DayOfWeek, StartTime, EndTime FROM TimeSlots ORDER BY TimeSlotID"
-        cursor.execute(query_timeslots)
-        db_timeslots = cursor.fetchall()
-        timeslots_list: List[TimeSlot] = []
-        timeslot_map_by_db_id: Dict[int, TimeSlot] = {}
-        timeslot_map_by_model_id: Dict[str, TimeSlot] = {}
-
-        for row in db_timeslots:
-            start_t = string_to_time(row['StartTime'])
-            end_t = string_to_time(row['EndTime'])
-            if not start_t or not end_t:
-                print(f"DATA_LOADER WARNING: Skipping TimeSlotID {row['TimeSlotID']} due to invalid time format: Start='{row['StartTime']}', End='{row['EndTime']}'")
-                continue
-            
-            ts_obj = TimeSlot(
-                id=str(row['TimeSlotID']),
-                day_of_week=str(row['DayOfWeek']),
-                start_time=start_t.strftime('%H:%M:%S'),
-                end_time=end_t.strftime('%H:%M:%S')
-            )
-            timeslots_list.append(ts_obj)
-            timeslot_map_by_db_id[int(row['TimeSlotID'])] = ts_obj
-            timeslot_map_by_model_id[ts_obj.id] = ts_obj
-        if not timeslots_list:
-            print(f"DATA_LOADER ERROR: No TimeSlots found in the database. Cannot proceed.")
-            return empty_return
-        print(f"DATA_LOADER INFO: Loaded {len(timeslots_list)} generic TimeSlots.")
-
-        print("DATA_LOADER INFO: Loading Classrooms...")
-        query_classrooms = "SELECT ClassroomID, RoomCode, Capacity, Type FROM Classrooms ORDER BY ClassroomID"
-        cursor.execute(query_classrooms)
-        classrooms_list: List[Classroom] = []
-        classroom_map_by_db_id: Dict[int, Classroom] = {}
-        for row in cursor.fetchall():
-            cr_obj = Classroom(
-                id=int(row['ClassroomID']),
-                room_code=str(row['RoomCode']),
-                capacity=int(row['Capacity']),
-                type=str(row['Type']) if row['Type'] is not None else 'Theory'
-            )
-            classrooms_list.append(cr_obj)
-            classroom_map_by_db_id[cr_obj.id] = cr_obj
-        if not classrooms_list:
-            print(f"DATA_LOADER WARNING: No Classrooms found. Scheduling might be impossible if rooms are required.")
-        print(f"DATA_LOADER INFO: Loaded {len(classrooms_list)} Classrooms.")
-
-        print("DATA_LOADER INFO: Loading Instructors...")
-        query_instructors = "SELECT LecturerID, LecturerName FROM Lecturers ORDER BY LecturerID"
-        cursor.execute(query_instructors)
-        instructors_list: List[Instructor] = []
-        instructor_map_by_db_id: Dict[int, Instructor] = {}
-        
-        for row in cursor.fetchall():
-            instr_obj = Instructor(
-                id=str(row['LecturerID']),
-                name=str(row['LecturerName']),
-                unavailable_slot_ids=set()
-            )
-            instructors_list.append(instr_obj)
-            instructor_map_by_db_id[int(row['LecturerID'])] = instr_obj
-        if not instructors_list:
-            print(f"DATA_LOADER WARNING: No Instructors found. Scheduling might be impossible if instructors are required.")
-        print(f"DATA_LOADER INFO: Loaded {len(instructors_list)} Instructors.")
-
-        print("DATA_LOADER INFO: Loading Courses Catalog...")
-        query_courses_table = """
-            SELECT CourseID, CourseName, ExpectedStudents, Credits, SessionDurationSlots 
-            FROM Courses 
-            ORDER BY CourseID
-        """
-        cursor.execute(query_courses_table)
-        db_courses_info = cursor.fetchall()
-        courses_catalog_map: Dict[str, Course] = {}
-
-        for row_course_info in db_courses_info:
-            course_id_str = str(row_course_info['CourseID'])
-            expected_students = int(row_course_info['ExpectedStudents'] or 0)
-            if expected_students == 0:
-                print(f"DATA_LOADER WARNING: Course {course_id_str} ('{row_course_info['CourseName']}') has 0 ExpectedStudents. This might affect scheduling constraints.")
-
-            credits_val = row_course_info['Credits']
-            
-            courses_catalog_map[course_id_str] = Course(
-                id=course_id_str,
-                name=str(row_course_info['CourseName']),
-                expected_students=expected_students,
-                credits=int(credits_val) if credits_val is not None else None,
-                required_periods_per_session=int(row_course_info['SessionDurationSlots'] or 1)
-            )
-
-        if not courses_catalog_map:
-            print(f"DATA_LOADER ERROR: No Courses found in the Courses table. Cannot effectively schedule.")
-            return empty_return
-        print(f"DATA_LOADER INFO: Loaded {len(courses_catalog_map)} Courses into catalog.")
-
-        print(f"DATA_LOADER INFO: Loading ScheduledClasses for SemesterID {semester_id_to_load}...")
-        query_scheduled_classes = """
-            SELECT ScheduleID, CourseID, LecturerID, ClassroomID, TimeSlotID, SemesterID
-            FROM ScheduledClasses
-            WHERE SemesterID = %s
-            ORDER BY ScheduleID
-        """
-        cursor.execute(query_scheduled_classes, (semester_id_to_load,))
-        db_scheduled_classes = cursor.fetchall()
-        scheduled_classes_list: List[ScheduledClass] = []
-
-        for sc_row in db_scheduled_classes:
-            course_id_str = str(sc_row['CourseID'])
-            course_obj = courses_catalog_map.get(course_id_str)
-
-            if not course_obj:
-                print(f"DATA_LOADER WARNING: ScheduledClass ID {sc_row['ScheduleID']} refers to CourseID {course_id_str} which is not in Courses catalog. Skipping.")
-                continue
-
-            num_students_for_class = course_obj.expected_students
-
-            lecturer_db_id = sc_row.get('LecturerID')
-            instructor_model_id: Optional[str] = None
-            if lecturer_db_id is not None:
-                lecturer_db_id_int = int(lecturer_db_id)
-                if lecturer_db_id_int in instructor_map_by_db_id:
-                    instructor_model_id = instructor_map_by_db_id[lecturer_db_id_int].id
-                else:
-                    print(f"DATA_LOADER WARNING: ScheduledClass ID {sc_row['ScheduleID']} has invalid LecturerID {lecturer_db_id_int}. Setting assignment to None.")
-            
-            classroom_db_id = sc_row.get('ClassroomID')
-            classroom_model_id: Optional[int] = None
-            if classroom_db_id is not None:
-                classroom_db_id_int = int(classroom_db_id)
-                if classroom_db_id_int in classroom_map_by_db_id:
-                    classroom_model_id = classroom_map_by_db_id[classroom_db_id_int].id
-                else:
-                    print(f"DATA_LOADER WARNING: ScheduledClass ID {sc_row['ScheduleID']} has invalid ClassroomID {classroom_db_id_int}. Setting assignment to None.")
-
-            timeslot_db_id = sc_row.get('TimeSlotID')
-            timeslot_model_id: Optional[str] = None
-            if timeslot_db_id is not None:
-                timeslot_db_id_int = int(timeslot_db_id)
-                if timeslot_db_id_int in timeslot_map_by_db_id:
-                    timeslot_model_id = timeslot_map_by_db_id[timeslot_db_id_int].id
-                else:
-                    print(f"DATA_LOADER WARNING: ScheduledClass ID {sc_row['ScheduleID']} has invalid TimeSlotID {timeslot_db_id_int}. Setting assignment to None.")
-
-            scheduled_classes_list.append(ScheduledClass(
-                id=int(sc_row['ScheduleID']),
-                course_id=course_id_str,
-                num_students=num_students_for_class,
-                semester_id=int(sc_row['SemesterID']),
-                instructor_id=instructor_model_id,
-                classroom_id=classroom_model_id,
-                timeslot_id=timeslot_model_id
-            ))
-        
-        if not scheduled_classes_list:
-            print(f"DATA_LOADER INFO: No pre-existing ScheduledClass entries found for SemesterID {semester_id_to_load}. "
-                  "The scheduling algorithm will generate a new schedule if courses are defined and need scheduling.")
-        else:
-            print(f"DATA_LOADER INFO: Loaded {len(scheduled_classes_list)} existing ScheduledClass entries for the semester.")
-        
-        print("DATA_LOADER INFO: Loading Students and their enrollments...")
-        query_students = "SELECT StudentID, StudentName FROM Students ORDER BY StudentID"
-        cursor.execute(query_students)
-        students_list: List[Student] = []
-        student_map_by_original_id: Dict[str, Student] = {}
-
-        for row in cursor.fetchall():
-            student_id_str = str(row['StudentID'])
-            student_name = str(row['StudentName']) if row['StudentName'] else None
-            student_obj = Student(id=student_id_str, name=student_name, enrolled_course_ids=set())
-            students_list.append(student_obj)
-            student_map_by_original_id[student_id_str] = student_obj
-
-        query_enrollments = """
-            SELECT StudentID, CourseID 
-            FROM StudentEnrollments 
-            WHERE SemesterID = %s
-        """
-        cursor.execute(query_enrollments, (semester_id_to_load,))
-        enrollments_count = 0
-        enrollments_processed_for_known_students_courses = 0
-        for row in cursor.fetchall():
-            enrollments_count +=1
-            student_original_id_str = str(row['StudentID'])
-            course_original_id_str = str(row['CourseID'])
-            
-            student_obj = student_map_by_original_id.get(student_original_id_str)
-            if student_obj:
-                if course_original_id_str in courses_catalog_map:
-                     student_obj.enrolled_course_ids.add(course_original_id_str)
-                     enrollments_processed_for_known_students_courses +=1
-                else:
-                    print(f"DATA_LOADER INFO: Student '{student_original_id_str}' enrollment for CourseID '{course_original_id_str}' skipped: Course not in catalog for this semester load.")
-            else:
-                 print(f"DATA_LOADER INFO: Enrollment for StudentID '{student_original_id_str}' (Course '{course_original_id_str}') skipped: Student not found in loaded students.")
-        print(f"DATA_LOADER INFO: Loaded {len(students_list)} Students. Processed {enrollments_processed_for_known_students_courses}/{enrollments_count} enrollments for semester {semester_id_to_load}.")
-
-        print("DATA_LOADER INFO: Updating Instructor unavailable slots...")
-        query_unavailable_defs = """
-            SELECT iu.LecturerID, iu.BusyDayOfWeek, iu.BusyStartTime, iu.BusyEndTime
-            FROM InstructorUnavailableSlots iu
-            WHERE iu.SemesterID = %s OR iu.SemesterID IS NULL 
-        """
-        cursor.execute(query_unavailable_defs, (semester_id_to_load,))
-        
-        unavailable_slots_processed = 0
-        for unavailable_def in cursor.fetchall():
-            lecturer_db_id_int = int(unavailable_def['LecturerID'])
-            instructor_obj = instructor_map_by_db_id.get(lecturer_db_id_int)
-
-            if not instructor_obj:
-                print(f"DATA_LOADER INFO: Unavailable slot definition for unknown LecturerDBID {lecturer_db_id_int}. Skipping.")
-                continue
-
-            busy_day_str = str(unavailable_def['BusyDayOfWeek'])
-            busy_start_time_obj = string_to_time(unavailable_def['BusyStartTime'])
-            busy_end_time_obj = string_to_time(unavailable_def['BusyEndTime'])
-
-            if not busy_start_time_obj or not busy_end_time_obj:
-                print(f"DATA_LOADER WARNING: Invalid time for unavailability for LecturerID {lecturer_db_id_int} (Name: {instructor_obj.name}). BusyDay: {busy_day_str}, Start: {unavailable_def['BusyStartTime']}, End: {unavailable_def['BusyEndTime']}. Skipping this entry.")
-                continue
-            
-            if busy_start_time_obj >= busy_end_time_obj:
-                print(f"DATA_LOADER WARNING: Invalid busy period (start >= end) for LecturerID {lecturer_db_id_int}. Start: {busy_start_time_obj}, End: {busy_end_time_obj}. Skipping.")
-                continue
-
-            for ts_model_id, ts_obj in timeslot_map_by_model_id.items():
-                if ts_obj.day_of_week.lower() == busy_day_str.lower():
-                    ts_start_obj = string_to_time(ts_obj.start_time)
-                    ts_end_obj = string_to_time(ts_obj.end_time)
-
-                    if not ts_start_obj or not ts_end_obj:
-                        print(f"DATA_LOADER CRITICAL WARNING: TimeSlot object {ts_obj.id} has invalid times. Skipping overlap check.")
-                        continue
-                        
-                    if check_time_overlap(ts_start_obj, ts_end_obj, busy_start_time_obj, busy_end_time_obj):
-                        instructor_obj.unavailable_slot_ids.add(ts_model_id)
-                        unavailable_slots_processed += 1
-
-        print(f"DATA_LOADER INFO: Updated unavailable slots for instructors. Applied {unavailable_slots_processed} specific slot blockages based on definitions.")
-
-    except mysql.connector.Error as err:
-        print(f"DATA_LOADER ERROR: Database error during data loading: {err}")
-        return empty_return
-    except Exception as e:
-        print(f"DATA_LOADER ERROR: An unexpected error occurred during data loading: {e}")
-        import traceback
-        traceback.print_exc()
-        return empty_return
-    finally:
-        if cursor:
-            cursor.close()
-        if conn and conn.is_connected():
-            conn.close()
-
-    print(f"DATA_LOADER INFO: Data loading process completed for SemesterID: {semester_id_to_load}.")
-    return scheduled_classes_list, instructors_list, classrooms_list, timeslots_list, students_list, courses_catalog_map
-
-if __name__ == '__main__':
-    print("DATA_LOADER: Running standalone test...")
-    target_semester_id = 1 
-
-    conn_test = get_db_connection()
-    sem_exists = False
-    if conn_test:
-        try:
-            cursor_test = conn_test.cursor(dictionary=True)
-            cursor_test.execute("SELECT SemesterName FROM Semesters WHERE SemesterID = %s", (target_semester_id,))
-            sem_row_test = cursor_test.fetchone()
-            if sem_row_test:
-                sem_exists = True
-                print(f"DATA_LOADER Test: SemesterID {target_semester_id} ('{sem_row_test['SemesterName']}') exists. Proceeding with load.")
-            cursor_test.close()
-        except Exception as e_test_sem:
-            print(f"DATA_LOADER Test ERROR: Error checking semester existence: {e_test_sem}")
-        finally:
-            if conn_test.is_connected():
-                conn_test.close()
-    
-    if not sem_exists:
-        print(f"DATA_LOADER Test ERROR: SemesterID {target_semester_id} does not exist in 'Semesters' table. Please check DB or change target_semester_id.")
-    else:
-        print(f"DATA_LOADER Test: Attempting to load all data for SemesterID {target_semester_id}...")
-        
-        loaded_scheduled_classes, loaded_instructors, loaded_classrooms, \
-        loaded_timeslots, loaded_students, loaded_courses_catalog = load_all_data(target_semester_id)
-
-        print(f"\n--- Data Loading Summary for Semester {target_semester_id} ---")
-        
-        print(f"Total TimeSlots loaded: {len(loaded_timeslots)}")
-        if loaded_timeslots:
-            for i in range(min(3, len(loaded_timeslots))):
-                 print(f"  Sample TimeSlot {i+1}: {loaded_timeslots[i]}")
-
-        print(f"Total Classrooms loaded: {len(loaded_classrooms)}")
-        if loaded_classrooms:
-            for i in range(min(3, len(loaded_classrooms))):
-                 print(f"  Sample Classroom {i+1}: {loaded_classrooms[i]}")
-
-        print(f"Total Instructors loaded: {len(loaded_instructors)}")
-        if loaded_instructors:
-            for i in range(min(3, len(loaded_instructors))):
-                instr = loaded_instructors[i]
-                print(f"  Sample Instructor {i+1}: ID={instr.id}, Name='{instr.name}', Unavailable Slot IDs: {instr.unavailable_slot_ids if instr.unavailable_slot_ids else 'None'}")
-
-        print(f"Total Courses in Catalog: {len(loaded_courses_catalog)}")
-        if loaded_courses_catalog:
-            count = 0
-            for course_id_sample, course_sample in loaded_courses_catalog.items():
-                print(f"  Sample Course {count+1}: {course_sample}")
-                count +=1
-                if count >=3: break
-        
-        print(f"Total Scheduled Classes loaded (input/existing): {len(loaded_scheduled_classes)}")
-        if loaded_scheduled_classes:
-            for i in range(min(3, len(loaded_scheduled_classes))):
-                 print(f"  Sample ScheduledClass {i+1}: {loaded_scheduled_classes[i]}")
-        
-        print(f"Total Students loaded: {len(loaded_students)}")
-        if loaded_students:
-            for i in range(min(3, len(loaded_students))):
-                stud = loaded_students[i]
-                enrolled_ids = list(stud.enrolled_course_ids)[:2]
-                print(f"  Sample Student {i+1}: ID={stud.id}, Name='{stud.name}', Enrolled Courses (sample): {enrolled_ids if enrolled_ids else 'None'}")
-        
+import mysql.connector
+from mysql.connector import pooling
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, time as dt_time
+from typing import List, Dict, Tuple, Set, FrozenSet, Optional, Iterator, Any
+from array import array
+import uuid
+import os
+import sys
+import mmap
+import pickle
+import hashlib
+
+from utils import TimeSlotDayIndex, DiagnosticsCollector, time_to_minutes
+from models import (
+    TimeSlot, Classroom, Instructor, Course, Student, ScheduledClass,
+    Schedule, SchedulingMetrics, SchedulingResult
+)
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'dss'
+}
+
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_MAGIC = b"DSSSNAP"
+SNAPSHOT_HEADER_SIZE = len(SNAPSHOT_MAGIC) + 2 + 32
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_cache")
+
+# Every table is fingerprinted with a CRC32 sum over the columns the loader reads, so in-place edits invalidate the snapshot.
+SNAPSHOT_FINGERPRINT_QUERIES = [
+    ("semester", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', SemesterID, SemesterName))), 0) FROM Semesters WHERE SemesterID = %s", True),
+    ("timeslots", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', TimeSlotID, DayOfWeek, StartTime, EndTime))), 0) FROM TimeSlots", False),
+    ("classrooms", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', ClassroomID, RoomCode, Capacity, Type))), 0) FROM Classrooms", False),
+    ("lecturers", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', LecturerID, LecturerName))), 0) FROM Lecturers", False),
+    ("courses", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', CourseID, CourseName, ExpectedStudents, Credits, SessionDurationSlots))), 0) FROM Courses", False),
+    ("scheduled_classes", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', ScheduleID, CourseID, LecturerID, ClassroomID, TimeSlotID))), 0) FROM ScheduledClasses WHERE SemesterID = %s", True),
+    ("unavailable_slots", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', LecturerID, BusyDayOfWeek, BusyStartTime, BusyEndTime, SemesterID))), 0) FROM InstructorUnavailableSlots WHERE SemesterID = %s OR SemesterID IS NULL", True),
+    ("students", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', StudentID, StudentName))), 0) FROM Students", False),
+    ("enrollments", "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', EnrollmentID, StudentID, CourseID))), 0) FROM StudentEnrollments WHERE SemesterID = %s", True),
+]
+
+DB_POOL_NAME = "dss_data_loader_pool"
+DB_POOL_SIZE = 8
+_CONNECTION_POOL: Optional[pooling.MySQLConnectionPool] = None
+
+def get_db_connection_pool() -> Optional[pooling.MySQLConnectionPool]:
+    global _CONNECTION_POOL
+    if _CONNECTION_POOL is None:
+        try:
+            _CONNECTION_POOL = pooling.MySQLConnectionPool(
+                pool_name=DB_POOL_NAME, pool_size=DB_POOL_SIZE, pool_reset_session=True, **DB_CONFIG
+            )
+        except mysql.connector.Error as err:
+            print(f"DATA_LOADER WARNING: Connection pool creation failed: {err}. Using direct connections.")
+            return None
+    return _CONNECTION_POOL
+
+def get_db_connection(use_pool: bool = False):
+    if use_pool:
+        pool = get_db_connection_pool()
+        if pool:
+            try:
+                return pool.get_connection()
+            except mysql.connector.Error as err:
+                print(f"DATA_LOADER WARNING: No pooled connection available ({err}). Opening a direct connection.")
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        return conn
+    except mysql.connector.Error as err:
+        print(f"DATA_LOADER ERROR: Database connection failed: {err}")
+        return None
+
+def string_to_time(time_str: any) -> Optional[dt_time]:
+    if isinstance(time_str, dt_time):
+        return time_str
+    if isinstance(time_str, timedelta):
+        return (datetime.min + time_str).time()
+    if not isinstance(time_str, str):
+        return None
+    try:
+        return datetime.strptime(time_str, '%H:%M:%S').time()
+    except ValueError:
+        try:
+            return datetime.strptime(time_str, '%H:%M').time()
+        except ValueError:
+            return None
+
+def check_time_overlap(slot_start: Optional[dt_time], slot_end: Optional[dt_time],
+                       busy_start: Optional[dt_time], busy_end: Optional[dt_time]) -> bool:
+    if not all(isinstance(t, dt_time) for t in [slot_start, slot_end, busy_start, busy_end]):
+        return False
+    if slot_start >= slot_end or busy_start >= busy_end:
+        return False
+    return max(slot_start, busy_start) < min(slot_end, busy_end)
+
+
+# (query, needs_semester_param) per source table; all of them are independent and can be fetched concurrently.
+LOADER_SOURCE_QUERIES: Dict[str, Tuple[str, bool]] = {
+    "semester": ("SELECT SemesterName FROM Semesters WHERE SemesterID = %s", True),
+    "timeslots": ("SELECT TimeSlotID, DayOfWeek, StartTime, EndTime FROM TimeSlots ORDER BY TimeSlotID", False),
+    "classrooms": ("SELECT ClassroomID, RoomCode, Capacity, Type FROM Classrooms ORDER BY ClassroomID", False),
+    "instructors": ("SELECT LecturerID, LecturerName FROM Lecturers ORDER BY LecturerID", False),
+    "courses": ("""
+            SELECT CourseID, CourseName, ExpectedStudents, Credits, SessionDurationSlots 
+            FROM Courses 
+            ORDER BY CourseID
+        """, False),
+    "scheduled_classes": ("""
+            SELECT ScheduleID, CourseID, LecturerID, ClassroomID, TimeSlotID, SemesterID
+            FROM ScheduledClasses
+            WHERE SemesterID = %s
+            ORDER BY ScheduleID
+        """, True),
+    "students": ("SELECT StudentID, StudentName FROM Students ORDER BY StudentID", False),
+    "unavailable_defs": ("""
+            SELECT iu.LecturerID, iu.BusyDayOfWeek, iu.BusyStartTime, iu.BusyEndTime
+            FROM InstructorUnavailableSlots iu
+            WHERE iu.SemesterID = %s OR iu.SemesterID IS NULL 
+        """, True),
+}
+
+# StudentEnrollments is by far the largest table, so it is streamed in tuple batches instead of fetchall().
+ENROLLMENTS_STREAM_QUERY = """
+    SELECT StudentID, CourseID 
+    FROM StudentEnrollments 
+    WHERE SemesterID = %s
+"""
+ENROLLMENT_FETCH_BATCH_SIZE = 5000
+
+def iter_enrollment_rows(conn, semester_id: int, batch_size: int = ENROLLMENT_FETCH_BATCH_SIZE) -> Iterator[Tuple[str, str]]:
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(ENROLLMENTS_STREAM_QUERY, (semester_id,))
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for student_id, course_id in batch:
+                yield str(student_id), str(course_id)
+    finally:
+        cursor.close()
+
+def fold_enrollment_rows(rows: Iterator[Tuple[str, str]]) -> Tuple[Dict[str, Set[str]], int]:
+    course_ids_by_student: Dict[str, Set[str]] = {}
+    row_count = 0
+    for student_id, course_id in rows:
+        row_count += 1
+        course_set = course_ids_by_student.get(student_id)
+        if course_set is None:
+            course_set = course_ids_by_student[student_id] = set()
+        course_set.add(course_id)
+    return course_ids_by_student, row_count
+
+def _fetch_enrollment_sets_pooled(semester_id: int) -> Tuple[Dict[str, Set[str]], int]:
+    conn = get_db_connection(use_pool=True)
+    if not conn:
+        raise mysql.connector.Error(msg="No connection available to stream enrollments.")
+    try:
+        return fold_enrollment_rows(iter_enrollment_rows(conn, semester_id))
+    finally:
+        if conn.is_connected():
+            conn.close()
+
+def load_enrollment_index_arrays(semester_id: int, student_index: Dict[str, int], course_index: Dict[str, int],
+                                 batch_size: int = ENROLLMENT_FETCH_BATCH_SIZE) -> Tuple[array, array]:
+    student_idx_arr = array('i')
+    course_idx_arr = array('i')
+    conn = get_db_connection(use_pool=True)
+    if not conn:
+        return student_idx_arr, course_idx_arr
+    try:
+        for student_id, course_id in iter_enrollment_rows(conn, semester_id, batch_size):
+            s_idx = student_index.get(student_id)
+            c_idx = course_index.get(course_id)
+            if s_idx is None or c_idx is None:
+                continue
+            student_idx_arr.append(s_idx)
+            course_idx_arr.append(c_idx)
+    except mysql.connector.Error as err:
+        print(f"DATA_LOADER ERROR: Streaming enrollments for SemesterID {semester_id} failed: {err}")
+    finally:
+        if conn.is_connected():
+            conn.close()
+    return student_idx_arr, course_idx_arr
+
+def _execute_source_query(cursor, source_key: str, semester_id: int) -> List[Dict]:
+    query, needs_semester = LOADER_SOURCE_QUERIES[source_key]
+    cursor.execute(query, (semester_id,) if needs_semester else ())
+    return cursor.fetchall()
+
+def _fetch_source_rows_pooled(source_key: str, semester_id: int) -> List[Dict]:
+    conn = get_db_connection(use_pool=True)
+    if not conn:
+        raise mysql.connector.Error(msg=f"No connection available to fetch '{source_key}'.")
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        return _execute_source_query(cursor, source_key, semester_id)
+    finally:
+        if cursor:
+            cursor.close()
+        if conn.is_connected():
+            conn.close()
+
+def fetch_source_rows(semester_id: int, parallel: bool = False, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    source_keys = list(LOADER_SOURCE_QUERIES.keys())
+    if parallel:
+        worker_count = max(1, min(max_workers or DB_POOL_SIZE, DB_POOL_SIZE, len(source_keys) + 1))
+        with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="dss_loader") as executor:
+            enrollments_future = executor.submit(_fetch_enrollment_sets_pooled, semester_id)
+            futures = {key: executor.submit(_fetch_source_rows_pooled, key, semester_id) for key in source_keys}
+            source_rows = {key: future.result() for key, future in futures.items()}
+            source_rows["enrollments"] = enrollments_future.result()
+            return source_rows
+
+    conn = get_db_connection()
+    if not conn:
+        raise mysql.connector.Error(msg="Database connection failed.")
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        source_rows = {key: _execute_source_query(cursor, key, semester_id) for key in source_keys}
+        cursor.close()
+        cursor = None
+        source_rows["enrollments"] = fold_enrollment_rows(iter_enrollment_rows(conn, semester_id))
+        return source_rows
+    finally:
+        if cursor:
+            cursor.close()
+        if conn.is_connected():
+            conn.close()
+
+LoadedSemesterData = Tuple[
+    List[ScheduledClass], List[Instructor], List[Classroom], List[TimeSlot], List[Student], Dict[str, Course]
+]
+
+def build_models_from_source_rows(semester_id_to_load: int, source_rows: Dict[str, Any],
+                                  verbose: bool = False) -> LoadedSemesterData:
+    diagnostics = DiagnosticsCollector("DATA_LOADER", verbose=verbose)
+    try:
+        return _build_models_from_source_rows(semester_id_to_load, source_rows, diagnostics)
+    finally:
+        diagnostics.emit_summary(f"load semester {semester_id_to_load}")
+
+def _build_models_from_source_rows(semester_id_to_load: int, source_rows: Dict[str, Any],
+                                   diagnostics: DiagnosticsCollector) -> LoadedSemesterData:
+    empty_return = [], [], [], [], [], {}
+
+    semester_row = source_rows["semester"][0] if source_rows["semester"] else None
+    if not semester_row:
+        print(f"DATA_LOADER ERROR: SemesterID {semester_id_to_load} not found.")
+        return empty_return
+    print(f"DATA_LOADER INFO: Confirmed Semester: {semester_row['SemesterName']} (ID: {semester_id_to_load}).")
+
+    print("DATA_LOADER INFO: Loading TimeSlots...")
+    db_timeslots = source_rows["timeslots"]
+    timeslots_list: List[TimeSlot] = []
+    timeslot_map_by_db_id: Dict[int, TimeSlot] = {}
+    timeslot_map_by_model_id: Dict[str, TimeSlot] = {}
+
+    for row in db_timeslots:
+        start_t = string_to_time(row['StartTime'])
+        end_t = string_to_time(row['EndTime'])
+        if not start_t or not end_t:
+            diagnostics.record("invalid_timeslot_time", f"WARNING: Skipping TimeSlotID {row['TimeSlotID']} due to invalid time format: Start='{row['StartTime']}', End='{row['EndTime']}'")
+            continue
+        
+        ts_obj = TimeSlot(
+            id=str(row['TimeSlotID']),
+            day_of_week=str(row['DayOfWeek']),
+            start_time=start_t.strftime('%H:%M:%S'),
+            end_time=end_t.strftime('%H:%M:%S')
+        )
+        if ts_obj.day_index < 0:
+            diagnostics.record("invalid_timeslot_day", f"WARNING: Skipping TimeSlotID {row['TimeSlotID']} due to unknown DayOfWeek '{row['DayOfWeek']}'.")
+            continue
+        timeslots_list.append(ts_obj)
+        timeslot_map_by_db_id[int(row['TimeSlotID'])] = ts_obj
+        timeslot_map_by_model_id[ts_obj.id] = ts_obj
+    if not timeslots_list:
+        print(f"DATA_LOADER ERROR: No TimeSlots found in the database. Cannot proceed.")
+        return empty_return
+    print(f"DATA_LOADER INFO: Loaded {len(timeslots_list)} generic TimeSlots.")
+
+    print("DATA_LOADER INFO: Loading Classrooms...")
+    classrooms_list: List[Classroom] = []
+    classroom_map_by_db_id: Dict[int, Classroom] = {}
+    for row in source_rows["classrooms"]:
+        cr_obj = Classroom(
+            id=int(row['ClassroomID']),
+            room_code=str(row['RoomCode']),
+            capacity=int(row['Capacity']),
+            type=str(row['Type']) if row['Type'] is not None else 'Theory'
+        )
+        classrooms_list.append(cr_obj)
+        classroom_map_by_db_id[cr_obj.id] = cr_obj
+    if not classrooms_list:
+        print(f"DATA_LOADER WARNING: No Classrooms found. Scheduling might be impossible if rooms are required.")
+    print(f"DATA_LOADER INFO: Loaded {len(classrooms_list)} Classrooms.")
+
+    print("DATA_LOADER INFO: Loading Instructors...")
+    instructors_list: List[Instructor] = []
+    instructor_map_by_db_id: Dict[int, Instructor] = {}
+    
+    for row in source_rows["instructors"]:
+        instr_obj = Instructor(
+            id=str(row['LecturerID']),
+            name=str(row['LecturerName']),
+            unavailable_slot_ids=set()
+        )
+        instructors_list.append(instr_obj)
+        instructor_map_by_db_id[int(row['LecturerID'])] = instr_obj
+    if not instructors_list:
+        print(f"DATA_LOADER WARNING: No Instructors found. Scheduling might be impossible if instructors are required.")
+    print(f"DATA_LOADER INFO: Loaded {len(instructors_list)} Instructors.")
+
+    print("DATA_LOADER INFO: Loading Courses Catalog...")
+    db_courses_info = source_rows["courses"]
+    courses_catalog_map: Dict[str, Course] = {}
+
+    for row_course_info in db_courses_info:
+        course_id_str = str(row_course_info['CourseID'])
+        expected_students = int(row_course_info['ExpectedStudents'] or 0)
+        if expected_students == 0:
+            diagnostics.record("course_zero_expected_students", f"WARNING: Course {course_id_str} ('{row_course_info['CourseName']}') has 0 ExpectedStudents. This might affect scheduling constraints.")
+
+        credits_val = row_course_info['Credits']
+        
+        courses_catalog_map[course_id_str] = Course(
+            id=course_id_str,
+            name=str(row_course_info['CourseName']),
+            expected_students=expected_students,
+            credits=int(credits_val) if credits_val is not None else None,
+            required_periods_per_session=int(row_course_info['SessionDurationSlots'] or 1)
+        )
+
+    if not courses_catalog_map:
+        print(f"DATA_LOADER ERROR: No Courses found in the Courses table. Cannot effectively schedule.")
+        return empty_return
+    print(f"DATA_LOADER INFO: Loaded {len(courses_catalog_map)} Courses into catalog.")
+
+    print(f"DATA_LOADER INFO: Loading ScheduledClasses for SemesterID {semester_id_to_load}...")
+    db_scheduled_classes = source_rows["scheduled_classes"]
+    scheduled_classes_list: List[ScheduledClass] = []
+
+    for sc_row in db_scheduled_classes:
+        course_id_str = str(sc_row['CourseID'])
+        course_obj = courses_catalog_map.get(course_id_str)
+
+        if not course_obj:
+            diagnostics.record("scheduled_class_unknown_course", f"WARNING: ScheduledClass ID {sc_row['ScheduleID']} refers to CourseID {course_id_str} which is not in Courses catalog. Skipping.")
+            continue
+
+        num_students_for_class = course_obj.expected_students
+
+        lecturer_db_id = sc_row.get('LecturerID')
+        instructor_model_id: Optional[str] = None
+        if lecturer_db_id is not None:
+            lecturer_db_id_int = int(lecturer_db_id)
+            if lecturer_db_id_int in instructor_map_by_db_id:
+                instructor_model_id = instructor_map_by_db_id[lecturer_db_id_int].id
+            else:
+                diagnostics.record("scheduled_class_invalid_lecturer", f"WARNING: ScheduledClass ID {sc_row['ScheduleID']} has invalid LecturerID {lecturer_db_id_int}. Setting assignment to None.")
+        
+        classroom_db_id = sc_row.get('ClassroomID')
+        classroom_model_id: Optional[int] = None
+        if classroom_db_id is not None:
+            classroom_db_id_int = int(classroom_db_id)
+            if classroom_db_id_int in classroom_map_by_db_id:
+                classroom_model_id = classroom_map_by_db_id[classroom_db_id_int].id
+            else:
+                diagnostics.record("scheduled_class_invalid_classroom", f"WARNING: ScheduledClass ID {sc_row['ScheduleID']} has invalid ClassroomID {classroom_db_id_int}. Setting assignment to None.")
+
+        timeslot_db_id = sc_row.get('TimeSlotID')
+        timeslot_model_id: Optional[str] = None
+        if timeslot_db_id is not None:
+            timeslot_db_id_int = int(timeslot_db_id)
+            if timeslot_db_id_int in timeslot_map_by_db_id:
+                timeslot_model_id = timeslot_map_by_db_id[timeslot_db_id_int].id
+            else:
+                diagnostics.record("scheduled_class_invalid_timeslot", f"WARNING: ScheduledClass ID {sc_row['ScheduleID']} has invalid TimeSlotID {timeslot_db_id_int}. Setting assignment to None.")
+
+        scheduled_classes_list.append(ScheduledClass(
+            id=int(sc_row['ScheduleID']),
+            course_id=course_id_str,
+            num_students=num_students_for_class,
+            semester_id=int(sc_row['SemesterID']),
+            instructor_id=instructor_model_id,
+            classroom_id=classroom_model_id,
+            timeslot_id=timeslot_model_id
+        ))
+    
+    if not scheduled_classes_list:
+        print(f"DATA_LOADER INFO: No pre-existing ScheduledClass entries found for SemesterID {semester_id_to_load}. "
+              "The scheduling algorithm will generate a new schedule if courses are defined and need scheduling.")
+    else:
+        print(f"DATA_LOADER INFO: Loaded {len(scheduled_classes_list)} existing ScheduledClass entries for the semester.")
+    
+    print("DATA_LOADER INFO: Loading Students and their enrollments...")
+    student_names_by_original_id: Dict[str, Optional[str]] = {}
+    for row in source_rows["students"]:
+        student_names_by_original_id[sys.intern(str(row['StudentID']))] = str(row['StudentName']) if row['StudentName'] else None
+
+    course_ids_by_student, enrollments_count = source_rows["enrollments"]
+    enrollments_processed_for_known_students_courses = 0
+    valid_course_ids_by_student: Dict[str, FrozenSet[str]] = {}
+    shared_course_id_sets: Dict[FrozenSet[str], FrozenSet[str]] = {}
+    for student_original_id_str, enrolled_course_id_set in course_ids_by_student.items():
+        is_known_student = student_original_id_str in student_names_by_original_id
+        valid_course_ids: Set[str] = set()
+        for course_original_id_str in enrolled_course_id_set:
+            if not is_known_student:
+                diagnostics.record("enrollment_unknown_student", f"INFO: Enrollment for StudentID '{student_original_id_str}' (Course '{course_original_id_str}') skipped: Student not found in loaded students.")
+            elif course_original_id_str in courses_catalog_map:
+                valid_course_ids.add(courses_catalog_map[course_original_id_str].id)
+                enrollments_processed_for_known_students_courses +=1
+            else:
+                diagnostics.record("enrollment_course_not_in_catalog", f"INFO: Student '{student_original_id_str}' enrollment for CourseID '{course_original_id_str}' skipped: Course not in catalog for this semester load.")
+        if valid_course_ids:
+            frozen_course_ids = frozenset(valid_course_ids)
+            valid_course_ids_by_student[student_original_id_str] = shared_course_id_sets.setdefault(frozen_course_ids, frozen_course_ids)
+    course_ids_by_student.clear()
+
+    students_list: List[Student] = [
+        Student(id=student_id_str, name=student_name,
+                enrolled_course_ids=valid_course_ids_by_student.get(student_id_str, frozenset()))
+        for student_id_str, student_name in student_names_by_original_id.items()
+    ]
+    print(f"DATA_LOADER INFO: Loaded {len(students_list)} Students. Processed {enrollments_processed_for_known_students_courses}/{enrollments_count} enrollments for semester {semester_id_to_load}.")
+
+    print("DATA_LOADER INFO: Updating Instructor unavailable slots...")
+    unavailable_slots_processed = 0
+    timeslot_day_index = TimeSlotDayIndex(timeslots_list)
+    for unavailable_def in source_rows["unavailable_defs"]:
+        lecturer_db_id_int = int(unavailable_def['LecturerID'])
+        instructor_obj = instructor_map_by_db_id.get(lecturer_db_id_int)
+
+        if not instructor_obj:
+            diagnostics.record("unavailability_unknown_lecturer", f"INFO: Unavailable slot definition for unknown LecturerDBID {lecturer_db_id_int}. Skipping.")
+            continue
+
+        busy_day_str = str(unavailable_def['BusyDayOfWeek'])
+        busy_start_min = time_to_minutes(unavailable_def['BusyStartTime'])
+        busy_end_min = time_to_minutes(unavailable_def['BusyEndTime'])
+
+        if busy_start_min is None or busy_end_min is None:
+            diagnostics.record("unavailability_invalid_time", f"WARNING: Invalid time for unavailability for LecturerID {lecturer_db_id_int} (Name: {instructor_obj.name}). BusyDay: {busy_day_str}, Start: {unavailable_def['BusyStartTime']}, End: {unavailable_def['BusyEndTime']}. Skipping this entry.")
+            continue
+        
+        if busy_start_min >= busy_end_min:
+            diagnostics.record("unavailability_invalid_period", f"WARNING: Invalid busy period (start >= end) for LecturerID {lecturer_db_id_int}. Start: {unavailable_def['BusyStartTime']}, End: {unavailable_def['BusyEndTime']}. Skipping.")
+            continue
+
+        for ts_model_id in timeslot_day_index.overlapping_slot_ids(busy_day_str, busy_start_min, busy_end_min):
+            instructor_obj.unavailable_slot_ids.add(ts_model_id)
+            unavailable_slots_processed += 1
+
+    print(f"DATA_LOADER INFO: Updated unavailable slots for instructors. Applied {unavailable_slots_processed} specific slot blockages based on definitions.")
+
+    print(f"DATA_LOADER INFO: Data loading process completed for SemesterID: {semester_id_to_load}.")
+    return scheduled_classes_list, instructors_list, classrooms_list, timeslots_list, students_list, courses_catalog_map
+
+def load_all_data(semester_id_to_load: int, parallel_fetch: bool = False, verbose: bool = False) -> LoadedSemesterData:
+    empty_return = [], [], [], [], [], {}
+
+    print(f"DATA_LOADER INFO: Starting data load for SemesterID: {semester_id_to_load}.")
+    try:
+        source_rows = fetch_source_rows(semester_id_to_load, parallel=parallel_fetch)
+        return build_models_from_source_rows(semester_id_to_load, source_rows, verbose=verbose)
+    except mysql.connector.Error as err:
+        print(f"DATA_LOADER ERROR: Database error during data loading: {err}")
+        return empty_return
+    except Exception as e:
+        print(f"DATA_LOADER ERROR: An unexpected error occurred during data loading: {e}")
+        import traceback
+        traceback.print_exc()
+        return empty_return
+
+
+def fetch_student_request_source_rows(semester_id: int, requested_course_ids: List[str]) -> Dict[str, Any]:
+    course_ids = sorted({str(c_id).strip() for c_id in requested_course_ids if c_id is not None and str(c_id).strip()})
+    if not course_ids: raise ValueError("Student request: 'requested_course_ids' has no non-empty course ID.")
+    course_placeholders = ", ".join(["%s"] * len(course_ids))
+
+    conn = get_db_connection(use_pool=True)
+    if not conn:
+        raise mysql.connector.Error(msg="Database connection failed.")
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        source_rows: Dict[str, Any] = {key: _execute_source_query(cursor, key, semester_id) for key in ("semester", "timeslots")}
+
+        cursor.execute(f"""
+            SELECT CourseID, CourseName, ExpectedStudents, Credits, SessionDurationSlots
+            FROM Courses
+            WHERE CourseID IN ({course_placeholders})
+            ORDER BY CourseID
+        """, tuple(course_ids))
+        source_rows["courses"] = cursor.fetchall()
+
+        # Only the lecturer links of existing classes matter for a student run; their rooms are not needed.
+        cursor.execute(f"""
+            SELECT ScheduleID, CourseID, LecturerID, NULL AS ClassroomID, TimeSlotID, SemesterID
+            FROM ScheduledClasses
+            WHERE SemesterID = %s AND CourseID IN ({course_placeholders})
+            ORDER BY ScheduleID
+        """, (semester_id, *course_ids))
+        source_rows["scheduled_classes"] = cursor.fetchall()
+
+        min_required_capacity = min(
+            (max(int(row['ExpectedStudents'] or 0), 1) for row in source_rows["courses"]), default=1
+        )
+        cursor.execute(
+            "SELECT ClassroomID, RoomCode, Capacity, Type FROM Classrooms WHERE Capacity >= %s ORDER BY ClassroomID",
+            (min_required_capacity,)
+        )
+        source_rows["classrooms"] = cursor.fetchall()
+
+        linked_lecturer_ids = sorted({int(row['LecturerID']) for row in source_rows["scheduled_classes"] if row['LecturerID'] is not None})
+        courses_with_linked_lecturer = {str(row['CourseID']) for row in source_rows["scheduled_classes"] if row['LecturerID'] is not None}
+        found_course_ids = {str(row['CourseID']) for row in source_rows["courses"]}
+
+        if linked_lecturer_ids and found_course_ids <= courses_with_linked_lecturer:
+            lecturer_placeholders = ", ".join(["%s"] * len(linked_lecturer_ids))
+            cursor.execute(
+                f"SELECT LecturerID, LecturerName FROM Lecturers WHERE LecturerID IN ({lecturer_placeholders}) ORDER BY LecturerID",
+                tuple(linked_lecturer_ids)
+            )
+            source_rows["instructors"] = cursor.fetchall()
+            cursor.execute(f"""
+                SELECT iu.LecturerID, iu.BusyDayOfWeek, iu.BusyStartTime, iu.BusyEndTime
+                FROM InstructorUnavailableSlots iu
+                WHERE (iu.SemesterID = %s OR iu.SemesterID IS NULL) AND iu.LecturerID IN ({lecturer_placeholders})
+            """, (semester_id, *linked_lecturer_ids))
+            source_rows["unavailable_defs"] = cursor.fetchall()
+        else:
+            # A requested course has no linked lecturer, so the solvers fall back to every lecturer; load them all.
+            source_rows["instructors"] = _execute_source_query(cursor, "instructors", semester_id)
+            source_rows["unavailable_defs"] = _execute_source_query(cursor, "unavailable_defs", semester_id)
+
+        source_rows["students"] = []
+        source_rows["enrollments"] = ({}, 0)
+        return source_rows
+    finally:
+        if cursor:
+            cursor.close()
+        if conn.is_connected():
+            conn.close()
+
+def load_data_for_student_request(semester_id_to_load: int, requested_course_ids: List[str],
+                                  verbose: bool = False) -> LoadedSemesterData:
+    empty_return = [], [], [], [], [], {}
+    if not requested_course_ids:
+        print(f"DATA_LOADER ERROR: Scoped student load for SemesterID {semester_id_to_load} called without requested courses.")
+        return empty_return
+
+    print(f"DATA_LOADER INFO: Starting scoped student-request load for SemesterID: {semester_id_to_load}, Courses: {list(requested_course_ids)}.")
+    try:
+        source_rows = fetch_student_request_source_rows(semester_id_to_load, requested_course_ids)
+        return build_models_from_source_rows(semester_id_to_load, source_rows, verbose=verbose)
+    except ValueError:
+        raise
+    except mysql.connector.Error as err:
+        print(f"DATA_LOADER ERROR: Database error during scoped data loading: {err}")
+        return empty_return
+    except Exception as e:
+        print(f"DATA_LOADER ERROR: An unexpected error occurred during scoped data loading: {e}")
+        import traceback
+        traceback.print_exc()
+        return empty_return
+
+def compute_source_fingerprint(semester_id: int) -> Optional[str]:
+    conn = get_db_connection(use_pool=True)
+    if not conn:
+        return None
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        hasher = hashlib.sha256(f"v{SNAPSHOT_FORMAT_VERSION}|sem{semester_id}".encode("utf-8"))
+        for table_key, query, needs_semester in SNAPSHOT_FINGERPRINT_QUERIES:
+            cursor.execute(query, (semester_id,) if needs_semester else ())
+            row = cursor.fetchone() or ()
+            hasher.update(f"|{table_key}:{':'.join(str(v) for v in row)}".encode("utf-8"))
+        return hasher.hexdigest()
+    except mysql.connector.Error as err:
+        print(f"DATA_LOADER WARNING: Could not compute source fingerprint for SemesterID {semester_id}: {err}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn and conn.is_connected():
+            conn.close()
+
+def get_snapshot_path(semester_id: int, snapshot_dir: Optional[str] = None) -> str:
+    return os.path.join(snapshot_dir or DEFAULT_SNAPSHOT_DIR, f"semester_{semester_id}.snapshot")
+
+def save_semester_snapshot(path: str, fingerprint: str, loaded_data: Tuple) -> bool:
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f_snap:
+            f_snap.write(SNAPSHOT_MAGIC)
+            f_snap.write(SNAPSHOT_FORMAT_VERSION.to_bytes(2, "little"))
+            f_snap.write(bytes.fromhex(fingerprint))
+            pickle.dump(loaded_data, f_snap, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e_snap_save:
+        print(f"DATA_LOADER WARNING: Could not write snapshot '{path}': {e_snap_save}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+def load_semester_snapshot(path: str, expected_fingerprint: str) -> Optional[Tuple]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f_snap:
+            with mmap.mmap(f_snap.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if len(mm) <= SNAPSHOT_HEADER_SIZE or mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                    return None
+                version = int.from_bytes(mm[len(SNAPSHOT_MAGIC):len(SNAPSHOT_MAGIC) + 2], "little")
+                stored_fingerprint = mm[len(SNAPSHOT_MAGIC) + 2:SNAPSHOT_HEADER_SIZE].hex()
+                if version != SNAPSHOT_FORMAT_VERSION or stored_fingerprint != expected_fingerprint:
+                    return None
+                payload_view = memoryview(mm)[SNAPSHOT_HEADER_SIZE:]
+                try:
+                    return pickle.loads(payload_view)
+                finally:
+                    payload_view.release()
+    except Exception as e_snap_load:
+        print(f"DATA_LOADER WARNING: Could not read snapshot '{path}': {e_snap_load}. Falling back to DB.")
+        return None
+
+def load_all_data_cached(semester_id_to_load: int, snapshot_dir: Optional[str] = None,
+                         parallel_fetch: bool = False, verbose: bool = False) -> LoadedSemesterData:
+    fingerprint = compute_source_fingerprint(semester_id_to_load)
+    if not fingerprint:
+        return load_all_data(semester_id_to_load, parallel_fetch=parallel_fetch, verbose=verbose)
+
+    snapshot_path = get_snapshot_path(semester_id_to_load, snapshot_dir)
+    cached_data = load_semester_snapshot(snapshot_path, fingerprint)
+    if cached_data is not None:
+        print(f"DATA_LOADER INFO: Loaded SemesterID {semester_id_to_load} from snapshot '{os.path.basename(snapshot_path)}'.")
+        return cached_data
+
+    loaded_data = load_all_data(semester_id_to_load, parallel_fetch=parallel_fetch, verbose=verbose)
+    scheduled_classes, instructors, classrooms, timeslots, students, courses_catalog = loaded_data
+    if timeslots and courses_catalog:
+        if save_semester_snapshot(snapshot_path, fingerprint, loaded_data):
+            print(f"DATA_LOADER INFO: Saved snapshot for SemesterID {semester_id_to_load} to '{os.path.basename(snapshot_path)}'.")
+    return loaded_data
+
+if __name__ == '__main__':
+    print("DATA_LOADER: Running standalone test...")
+    target_semester_id = 1 
+
+    conn_test = get_db_connection()
+    sem_exists = False
+    if conn_test:
+        try:
+            cursor_test = conn_test.cursor(dictionary=True)
+            cursor_test.execute("SELECT SemesterName FROM Semesters WHERE SemesterID = %s", (target_semester_id,))
+            sem_row_test = cursor_test.fetchone()
+            if sem_row_test:
+                sem_exists = True
+                print(f"DATA_LOADER Test: SemesterID {target_semester_id} ('{sem_row_test['SemesterName']}') exists. Proceeding with load.")
+            cursor_test.close()
+        except Exception as e_test_sem:
+            print(f"DATA_LOADER Test ERROR: Error checking semester existence: {e_test_sem}")
+        finally:
+            if conn_test.is_connected():
+                conn_test.close()
+    
+    if not sem_exists:
+        print(f"DATA_LOADER Test ERROR: SemesterID {target_semester_id} does not exist in 'Semesters' table. Please check DB or change target_semester_id.")
+    else:
+        print(f"DATA_LOADER Test: Attempting to load all data for SemesterID {target_semester_id}...")
+        
+        loaded_scheduled_classes, loaded_instructors, loaded_classrooms, \
+        loaded_timeslots, loaded_students, loaded_courses_catalog = load_all_data(target_semester_id)
+
+        print(f"\n--- Data Loading Summary for Semester {target_semester_id} ---")
+        
+        print(f"Total TimeSlots loaded: {len(loaded_timeslots)}")
+        if loaded_timeslots:
+            for i in range(min(3, len(loaded_timeslots))):
+                 print(f"  Sample TimeSlot {i+1}: {loaded_timeslots[i]}")
+
+        print(f"Total Classrooms loaded: {len(loaded_classrooms)}")
+        if loaded_classrooms:
+            for i in range(min(3, len(loaded_classrooms))):
+                 print(f"  Sample Classroom {i+1}: {loaded_classrooms[i]}")
+
+        print(f"Total Instructors loaded: {len(loaded_instructors)}")
+        if loaded_instructors:
+            for i in range(min(3, len(loaded_instructors))):
+                instr = loaded_instructors[i]
+                print(f"  Sample Instructor {i+1}: ID={instr.id}, Name='{instr.name}', Unavailable Slot IDs: {instr.unavailable_slot_ids if instr.unavailable_slot_ids else 'None'}")
+
+        print(f"Total Courses in Catalog: {len(loaded_courses_catalog)}")
+        if loaded_courses_catalog:
+            count = 0
+            for course_id_sample, course_sample in loaded_courses_catalog.items():
+                print(f"  Sample Course {count+1}: {course_sample}")
+                count +=1
+                if count >=3: break
+        
+        print(f"Total Scheduled Classes loaded (input/existing): {len(loaded_scheduled_classes)}")
+        if loaded_scheduled_classes:
+            for i in range(min(3, len(loaded_scheduled_classes))):
+                 print(f"  Sample ScheduledClass {i+1}: {loaded_scheduled_classes[i]}")
+        
+        print(f"Total Students loaded: {len(loaded_students)}")
+        if loaded_students:
+            for i in range(min(3, len(loaded_students))):
+                stud = loaded_students[i]
+                enrolled_ids = list(stud.enrolled_course_ids)[:2]
+                print(f"  Sample Student {i+1}: ID={stud.id}, Name='{stud.name}', Enrolled Courses (sample): {enrolled_ids if enrolled_ids else 'None'}")
+        
         print("\nDATA_LOADER Test: Load process finished.")
\ No newline at end of file
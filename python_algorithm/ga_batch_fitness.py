@@ -0,0 +1,182 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+class BatchFitnessEvaluator:
+    """Scores a whole GA population at once from (population x items) gene matrices.
+
+    Mirrors GeneticAlgorithmScheduler._calculate_fitness term by term; that method stays the reference implementation.
+    Per-item and per-ID constants are turned into lookup tables once, so each call is a handful of array operations.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        ga = scheduler
+        self.num_items = ga.num_items
+        self.num_lect_ids = max(ga.all_mapped_lect_ids, default=-1) + 1
+        self.num_room_ids = max(ga.all_mapped_room_ids, default=-1) + 1
+        self.num_ts_ids = len(ga.timeslot_start_minutes)
+        item_num_students = np.asarray(ga.item_num_students, dtype=np.int64)
+
+        # Hard constraints: lecturer unavailability and room capacity as boolean lookups.
+        self.lecturer_unavailable = np.zeros((self.num_lect_ids + 1, self.num_ts_ids + 1), dtype=bool)
+        for lect_id, unavailable_ts_ids in ga.lecturer_unavailable_ts_ids.items():
+            for ts_id in unavailable_ts_ids:
+                if 0 <= ts_id < self.num_ts_ids: self.lecturer_unavailable[lect_id, ts_id] = True
+        room_capacities = np.zeros(self.num_room_ids + 1, dtype=np.int64)
+        room_is_known = np.zeros(self.num_room_ids + 1, dtype=bool)
+        for room_id, capacity in ga.room_capacity_by_mapped_id.items():
+            room_capacities[room_id] = capacity
+            room_is_known[room_id] = True
+        self.item_room_over_capacity = (item_num_students[:, None] > 0) & room_is_known[None, :] & \
+                                       (item_num_students[:, None] > room_capacities[None, :])
+
+        # Room fill: the soft penalty every (item, room) pairing would contribute.
+        self.item_room_fill_penalty = np.zeros((self.num_items, self.num_room_ids + 1), dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fill_ratios = item_num_students[:, None] / room_capacities[None, :]
+        fill_applies = (item_num_students[:, None] > 0) & (room_capacities[None, :] > 0)
+        severe_fill = fill_applies & (fill_ratios < ga.target_classroom_fill_ratio_min * 0.5)
+        slight_fill = fill_applies & ~severe_fill & (fill_ratios < ga.target_classroom_fill_ratio_min)
+        self.item_room_fill_penalty[severe_fill] = ga.penalty_classroom_underutilized
+        self.item_room_fill_penalty[slight_fill] = ga.penalty_classroom_slightly_empty * ga.classroom_slightly_empty_multiplier * \
+                                                   (ga.target_classroom_fill_ratio_min - fill_ratios[slight_fill])
+
+        # Lecturer load and breaks only count items whose course is in the catalog, placed in a known timeslot.
+        self.item_required_periods = np.asarray([p if p is not None else 0 for p in ga.item_required_periods], dtype=np.int64)
+        self.item_counts_for_load = np.asarray([p is not None for p in ga.item_required_periods], dtype=bool)
+        self.timeslot_is_known = np.zeros(self.num_ts_ids + 1, dtype=bool)
+        self.timeslot_is_known[[ts_id for ts_id in ga.all_mapped_ts_ids if ts_id < self.num_ts_ids]] = True
+        self.timeslot_starts = np.append(np.asarray(ga.timeslot_start_minutes, dtype=np.int64), -1)
+        self.timeslot_ends = np.append(np.asarray(ga.timeslot_end_minutes, dtype=np.int64), -1)
+        self.timeslot_days = np.append(np.asarray(ga.timeslot_day_indices, dtype=np.int64), -1)
+
+        # Student clashes: course x course shared-student counts over the courses the items use, and slot overlaps.
+        self.track_student_clashes = ga.run_type == "admin_optimize_semester" and bool(ga.course_pair_shared_students)
+        clash_course_ids = sorted({c_id for c_id in ga.item_course_ids if ga.course_pair_shared_students.get(c_id)})
+        clash_col_by_course_id = {c_id: col for col, c_id in enumerate(clash_course_ids)}
+        self.item_clash_col = np.asarray([clash_col_by_course_id.get(c_id, -1) for c_id in ga.item_course_ids], dtype=np.int64)
+        self.shared_students = np.zeros((len(clash_course_ids), len(clash_course_ids)), dtype=np.float64)
+        for col_a, course_a in enumerate(clash_course_ids):
+            shared_row = ga.course_pair_shared_students[course_a]
+            for col_b, course_b in enumerate(clash_course_ids):
+                self.shared_students[col_a, col_b] = shared_row.get(course_b, 0)
+        self.num_clash_ts_ids = len(ga.overlapping_timeslot_ids)
+        self.timeslot_overlaps = np.zeros((self.num_clash_ts_ids, self.num_clash_ts_ids), dtype=np.float64)
+        for ts_a, overlapping_ids in enumerate(ga.overlapping_timeslot_ids):
+            self.timeslot_overlaps[ts_a, overlapping_ids] = 1.0
+
+    @staticmethod
+    def _rows_have_duplicates(keys: np.ndarray) -> np.ndarray:
+        sorted_keys = np.sort(keys, axis=1)
+        return ((sorted_keys[:, 1:] == sorted_keys[:, :-1]) & (sorted_keys[:, 1:] >= 0)).any(axis=1)
+
+    def _hard_violation_mask(self, rooms: np.ndarray, timeslots: np.ndarray, lecturers: np.ndarray, placed: np.ndarray) -> np.ndarray:
+        ga = self.scheduler
+        # Unplaced items get distinct negative keys so they never collide in the duplicate checks.
+        unplaced_keys = -1 - np.arange(self.num_items, dtype=np.int64)[None, :]
+        lect_safe = np.where(lecturers >= 0, lecturers, self.num_lect_ids)
+        room_safe = np.where(rooms >= 0, rooms, self.num_room_ids)
+
+        violations = (placed & ((lecturers < 0) | (rooms < 0))).any(axis=1)
+        violations |= (placed & self.lecturer_unavailable[lect_safe, timeslots]).any(axis=1)
+        violations |= (placed & self.item_room_over_capacity[np.arange(self.num_items)[None, :], room_safe]).any(axis=1)
+        violations |= self._rows_have_duplicates(np.where(placed & (lecturers >= 0), lect_safe * (self.num_ts_ids + 1) + timeslots, unplaced_keys))
+        violations |= self._rows_have_duplicates(np.where(placed & (rooms >= 0), room_safe * (self.num_ts_ids + 1) + timeslots, unplaced_keys))
+        if ga.run_type == "student_schedule_request":
+            violations |= self._rows_have_duplicates(np.where(placed, timeslots, unplaced_keys))
+        return violations
+
+    def _student_clash_counts(self, timeslots: np.ndarray, placed: np.ndarray) -> np.ndarray:
+        population_size = timeslots.shape[0]
+        num_clash_courses = self.shared_students.shape[0]
+        clash_eligible = placed & (self.item_clash_col[None, :] >= 0) & (timeslots < self.num_clash_ts_ids)
+        if not num_clash_courses or not clash_eligible.any(): return np.zeros(population_size, dtype=np.int64)
+
+        # courses_at_slot[p, t, c]: events of course c placed at slot t in individual p.
+        row_idx, item_idx = np.nonzero(clash_eligible)
+        courses_at_slot = np.zeros((population_size, self.num_clash_ts_ids, num_clash_courses), dtype=np.float64)
+        np.add.at(courses_at_slot, (row_idx, timeslots[row_idx, item_idx], self.item_clash_col[item_idx]), 1.0)
+
+        # Ordered event pairs (self-pairs included) weighted by overlap and shared students: X S X^T summed under the overlap mask.
+        shared_at_slot = courses_at_slot @ self.shared_students
+        slot_pair_shared = shared_at_slot @ courses_at_slot.transpose(0, 2, 1)
+        ordered_pair_total = (slot_pair_shared * self.timeslot_overlaps[None, :, :]).sum(axis=(1, 2))
+        self_pair_total = np.zeros(population_size, dtype=np.float64)
+        item_clash_cols = self.item_clash_col[item_idx]
+        item_ts_ids = timeslots[row_idx, item_idx]
+        np.add.at(self_pair_total, row_idx, self.timeslot_overlaps[item_ts_ids, item_ts_ids] * self.shared_students[item_clash_cols, item_clash_cols])
+        return np.rint((ordered_pair_total - self_pair_total) / 2.0).astype(np.int64)
+
+    def _lecturer_load_and_break_penalties(self, timeslots: np.ndarray, lecturers: np.ndarray, placed: np.ndarray) -> np.ndarray:
+        ga = self.scheduler
+        population_size = timeslots.shape[0]
+        ts_safe = np.where(placed, timeslots, self.num_ts_ids)
+        counts_for_load = placed & (lecturers >= 0) & self.item_counts_for_load[None, :] & self.timeslot_is_known[ts_safe]
+
+        row_idx, item_idx = np.nonzero(counts_for_load)
+        load_keys = row_idx * self.num_lect_ids + lecturers[row_idx, item_idx]
+        periods = np.bincount(load_keys, weights=self.item_required_periods[item_idx], minlength=population_size * self.num_lect_ids)
+        event_counts = np.bincount(load_keys, minlength=population_size * self.num_lect_ids)
+        periods = periods.reshape(population_size, self.num_lect_ids)
+        has_events = event_counts.reshape(population_size, self.num_lect_ids) > 0
+        overload_units = np.where(has_events, np.maximum(0, periods - ga.lecturer_max_periods), 0).sum(axis=1)
+        underload_units = np.where(has_events, np.maximum(0, ga.lecturer_min_periods - periods), 0).sum(axis=1)
+
+        # Breaks: sort each individual's events by (lecturer, start, item position) and inspect neighbours.
+        starts, ends, days = self.timeslot_starts[ts_safe], self.timeslot_ends[ts_safe], self.timeslot_days[ts_safe]
+        has_times = counts_for_load & (starts >= 0) & (ends >= 0)
+        start_span = int(self.timeslot_starts.max(initial=0)) + 1
+        item_positions = np.arange(self.num_items, dtype=np.int64)[None, :]
+        timeline_keys = (np.where(lecturers >= 0, lecturers, 0) * start_span + np.maximum(starts, 0)) * self.num_items + item_positions
+        timeline_keys = np.where(has_times, timeline_keys, np.iinfo(np.int64).max)
+        order = np.argsort(timeline_keys, axis=1, kind="stable")
+        sorted_valid = np.take_along_axis(has_times, order, axis=1)
+        sorted_lects = np.take_along_axis(lecturers, order, axis=1)
+        sorted_starts = np.take_along_axis(starts, order, axis=1)
+        sorted_ends = np.take_along_axis(ends, order, axis=1)
+        sorted_days = np.take_along_axis(days, order, axis=1)
+        break_gaps = sorted_starts[:, 1:] - sorted_ends[:, :-1]
+        short_breaks = sorted_valid[:, 1:] & sorted_valid[:, :-1] & (sorted_lects[:, 1:] == sorted_lects[:, :-1]) & \
+                       (sorted_days[:, 1:] == sorted_days[:, :-1]) & (break_gaps >= 0) & (break_gaps < ga.lecturer_min_break_minutes)
+        insufficient_break_counts = short_breaks.sum(axis=1)
+
+        return ga.penalty_lecturer_overload * overload_units + ga.penalty_lecturer_underload * underload_units + \
+               ga.penalty_lecturer_insufficient_break * insufficient_break_counts
+
+    def evaluate(self, rooms: np.ndarray, timeslots: np.ndarray, lecturers: np.ndarray) -> np.ndarray:
+        """Penalty vector for (population x items) room, timeslot and lecturer ID matrices (-1 = unset)."""
+        ga = self.scheduler
+        population_size = timeslots.shape[0]
+        penalties = np.zeros(population_size, dtype=np.float64)
+        if not population_size: return penalties
+        timeslots = np.where(timeslots < self.num_ts_ids, timeslots, -1)
+        placed = timeslots >= 0
+        ts_safe = np.where(placed, timeslots, self.num_ts_ids)
+
+        hard_violations = self._hard_violation_mask(rooms, ts_safe, lecturers, placed)
+        penalties[hard_violations] = ga.penalty_hard_constraint_violation if ga.allow_hard_constraint_violations_in_ga else np.inf
+        # Without the violation allowance invalid rows are final at inf, so soft terms are only computed for the rest.
+        scored_rows = np.arange(population_size) if ga.allow_hard_constraint_violations_in_ga else np.flatnonzero(~hard_violations)
+        if not len(scored_rows): return penalties
+        rooms, timeslots, lecturers, placed = rooms[scored_rows], timeslots[scored_rows], lecturers[scored_rows], placed[scored_rows]
+
+        soft_penalties = self._lecturer_load_and_break_penalties(timeslots, lecturers, placed)
+        if self.track_student_clashes:
+            soft_penalties += ga.penalty_student_clash * self._student_clash_counts(timeslots, placed)
+        room_safe = np.where(placed & (rooms >= 0), rooms, self.num_room_ids)
+        soft_penalties += self.item_room_fill_penalty[np.arange(self.num_items)[None, :], room_safe].sum(axis=1)
+        if ga.run_type == "student_schedule_request" and ga.student_preferences:
+            for row_idx in range(len(scored_rows)):
+                soft_penalties[row_idx] += ga._student_preference_penalty(ga._placed_timeslot_ids(timeslots[row_idx].tolist()))
+        penalties[scored_rows] += soft_penalties
+        return penalties
+
+    def evaluate_chromosomes(self, chromosomes: Sequence) -> List[float]:
+        if not chromosomes: return []
+        gene_matrices: Tuple[np.ndarray, ...] = tuple(
+            np.array([np.frombuffer(getattr(chromosome, gene_name), dtype=np.intc) for chromosome in chromosomes], dtype=np.int64)
+            for gene_name in ("rooms", "timeslots", "lecturers")
+        )
+        return self.evaluate(*gene_matrices).tolist()
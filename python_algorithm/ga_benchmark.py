@@ -0,0 +1,180 @@
+import math
+import random
+import time as pytime
+import sys
+from typing import List, Dict, Tuple, Any, Optional
+
+from models import ScheduledClass, Course, Instructor, Classroom, TimeSlot, Student
+from utils import preprocess_data_for_cp_and_ga
+from ga_module import GeneticAlgorithmScheduler, ScheduleChromosome, ScheduleFitnessState
+
+BENCHMARK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+BENCHMARK_DAILY_WINDOWS = [("07:00:00", "09:30:00"), ("09:40:00", "12:10:00"), ("13:00:00", "15:30:00"),
+                           ("15:40:00", "18:10:00"), ("18:20:00", "20:50:00")]
+# Preferences for the student_schedule_request check; strict enough that every preference term fires.
+BENCHMARK_STUDENT_PREFERENCES = {"time_of_day": "morning", "max_consecutive_classes": "1", "friday_off": True,
+                                 "compact_days": True, "target_max_days": "2"}
+
+
+def build_synthetic_processed_data(num_items: int = 300, num_courses: int = 120, num_lecturers: int = 60,
+                                   num_rooms: int = 40, num_students: int = 3000, courses_per_student: int = 5,
+                                   seed: int = 42, run_type: str = "admin_optimize_semester",
+                                   num_requested_courses: int = 6) -> Dict[str, Any]:
+    """Admin data schedules every class; a student_schedule_request gets one virtual item per requested course,
+    with the generated classes as the reference for potential lecturers."""
+    rng = random.Random(seed)
+    timeslots = []
+    for day_name in BENCHMARK_DAYS:
+        for start_str, end_str in BENCHMARK_DAILY_WINDOWS:
+            timeslots.append(TimeSlot(id=str(len(timeslots) + 1), day_of_week=day_name, start_time=start_str, end_time=end_str))
+    classrooms = [Classroom(id=room_idx + 1, room_code=f"R{room_idx + 1:03d}", capacity=rng.choice([40, 60, 80, 120, 200]))
+                  for room_idx in range(num_rooms)]
+    instructors = [Instructor(id=str(1000 + lect_idx), name=f"Lecturer {lect_idx}",
+                              unavailable_slot_ids={ts.id for ts in rng.sample(timeslots, 2)})
+                   for lect_idx in range(num_lecturers)]
+    courses_catalog = {f"C{course_idx:04d}": Course(id=f"C{course_idx:04d}", name=f"Course {course_idx}",
+                                                    expected_students=rng.randint(20, 150), credits=3,
+                                                    required_periods_per_session=rng.choice([2, 3]))
+                       for course_idx in range(num_courses)}
+    course_ids = sorted(courses_catalog.keys())
+    scheduled_classes = [ScheduledClass(id=item_idx + 1, course_id=course_ids[item_idx % num_courses], semester_id=1,
+                                        num_students=rng.randint(20, 120),
+                                        instructor_id=str(1000 + rng.randrange(num_lecturers)))
+                         for item_idx in range(num_items)]
+    # Students come in cohorts sharing a course set, which is what the enrollment profiles collapse.
+    cohort_course_sets = [frozenset(rng.sample(course_ids, courses_per_student)) for _ in range(max(1, num_students // 40))]
+    students = [Student(id=f"S{student_idx:06d}", enrolled_course_ids=rng.choice(cohort_course_sets))
+                for student_idx in range(num_students)]
+    items_to_schedule, priority_settings = scheduled_classes, {}
+    if run_type == "student_schedule_request":
+        requested_course_ids = sorted(rng.sample(course_ids, min(num_requested_courses, num_courses)))
+        items_to_schedule = [ScheduledClass(id=-(item_idx + 1), course_id=course_id, semester_id=1,
+                                            num_students=courses_catalog[course_id].expected_students or 25)
+                             for item_idx, course_id in enumerate(requested_course_ids)]
+        priority_settings = {"student_id": students[0].id}
+    return preprocess_data_for_cp_and_ga(
+        items_to_schedule, courses_catalog, instructors, classrooms, timeslots, students,
+        reference_scheduled_classes=scheduled_classes, semester_id_for_settings=1,
+        priority_settings=priority_settings, run_type=run_type
+    )
+
+
+class EagerCopyGeneticAlgorithmScheduler(GeneticAlgorithmScheduler):
+    """Baseline that copies every individual an operator touches, as the GA did before copy-on-write."""
+
+    def _selection(self, evaluated_population: List[Tuple[float, ScheduleChromosome]]) -> List[ScheduleChromosome]:
+        return [chromosome.copy() for chromosome in super()._selection(evaluated_population)]
+
+    def _crossover(self, parent1: ScheduleChromosome, parent2: ScheduleChromosome) -> Tuple[ScheduleChromosome, ScheduleChromosome]:
+        child1, child2 = super()._crossover(parent1.copy(), parent2.copy())
+        return child1.copy(), child2.copy()
+
+    def _mutate(self, chromosome: ScheduleChromosome) -> ScheduleChromosome:
+        return super()._mutate(chromosome.copy()).copy()
+
+    def _evaluate_individual(self, chromosome: ScheduleChromosome) -> float:
+        return self._calculate_fitness(chromosome)
+
+
+def _penalties_match(penalty1: float, penalty2: float) -> bool:
+    return penalty1 == penalty2 or math.isclose(penalty1, penalty2, rel_tol=1e-9, abs_tol=1e-6)
+
+
+def check_fitness_equivalence(processed_data: Dict[str, Any], num_individuals: int = 40, seed: int = 11,
+                              run_type: str = "admin_optimize_semester",
+                              student_preferences: Optional[Dict[str, Any]] = None) -> int:
+    """Scores random individuals, some with unplaced genes, through the batch evaluator and the
+    local search delta state.
+    Both must match _calculate_fitness, the reference, with hard violations allowed and with them disallowed."""
+    num_checked = 0
+    for allow_hard_violations in (True, False):
+        random.seed(seed)
+        ga_scheduler = GeneticAlgorithmScheduler(
+            processed_data=processed_data, initial_population_from_cp=[], allow_hard_constraint_violations_in_ga=allow_hard_violations,
+            progress_logger=lambda msg: None, run_type=run_type, student_specific_preferences=student_preferences,
+            use_batch_evaluation=True
+        )
+        if ga_scheduler.batch_fitness_evaluator is None:
+            print("GA_BENCHMARK: NumPy not available, batch evaluation not checked.", flush=True)
+            return num_checked
+        individuals = [chromosome for chromosome in (ga_scheduler._create_random_individual() for _ in range(num_individuals)) if chromosome]
+        for chromosome in individuals[:num_individuals // 2]:
+            for _ in range(5):
+                chromosome = chromosome.with_gene("timeslots", random.randrange(len(chromosome)),
+                                                  random.choice(ga_scheduler.all_mapped_ts_ids + [-1]))
+            individuals.append(chromosome)
+
+        batch_penalties = ga_scheduler.batch_fitness_evaluator.evaluate_chromosomes(individuals)
+        for chromosome, batch_penalty in zip(individuals, batch_penalties):
+            reference_penalty = ga_scheduler._calculate_fitness(chromosome)
+            delta_penalty = ScheduleFitnessState(ga_scheduler, chromosome).penalty()
+            assert _penalties_match(batch_penalty, reference_penalty), \
+                f"batch penalty {batch_penalty} != reference {reference_penalty} ({run_type}, hard violations allowed: {allow_hard_violations})"
+            assert _penalties_match(delta_penalty, reference_penalty), \
+                f"delta penalty {delta_penalty} != reference {reference_penalty} ({run_type}, hard violations allowed: {allow_hard_violations})"
+        num_checked += len(individuals)
+    return num_checked
+
+
+def time_ga_generations(scheduler_cls: type, processed_data: Dict[str, Any], population_size: int,
+                        generations: int, seed: int = 7, **scheduler_kwargs) -> Dict[str, Any]:
+    random.seed(seed)
+    if scheduler_cls is EagerCopyGeneticAlgorithmScheduler:
+        scheduler_kwargs.setdefault("use_batch_evaluation", False)
+        scheduler_kwargs.setdefault("fitness_cache_size", 0)
+    ga_scheduler = scheduler_cls(
+        processed_data=processed_data, initial_population_from_cp=[],
+        population_size=population_size, generations=generations,
+        allow_hard_constraint_violations_in_ga=True, progress_logger=lambda msg: None,
+        run_type="admin_optimize_semester", **scheduler_kwargs
+    )
+    run_start_time = pytime.perf_counter()
+    _, best_penalty, _ = ga_scheduler.run()
+    elapsed_seconds = pytime.perf_counter() - run_start_time
+    return {
+        "scheduler": scheduler_cls.__name__,
+        "elapsed_seconds": elapsed_seconds,
+        "seconds_per_generation": elapsed_seconds / max(1, generations),
+        "best_penalty": best_penalty
+    }
+
+
+def print_benchmark_row(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    speedup_str = ""
+    if baseline and result["seconds_per_generation"] > 0:
+        speedup_str = f"  x{baseline['seconds_per_generation'] / result['seconds_per_generation']:.2f} vs baseline"
+    print(f"GA_BENCHMARK: {result['scheduler']:<40} {result['seconds_per_generation'] * 1000:9.2f} ms/gen  "
+          f"best={result['best_penalty']:.2f}{speedup_str}", flush=True)
+
+
+if __name__ == "__main__":
+    num_items_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    population_size_arg = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    generations_arg = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    num_workers_arg = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+
+    print(f"GA_BENCHMARK: items={num_items_arg}, population={population_size_arg}, generations={generations_arg}", flush=True)
+    benchmark_data = build_synthetic_processed_data(num_items=num_items_arg)
+    num_checked_arg = check_fitness_equivalence(benchmark_data)
+    print(f"GA_BENCHMARK: batch, delta and serial penalties agree on {num_checked_arg} individuals "
+          f"(hard violations allowed and disallowed).", flush=True)
+    student_benchmark_data = build_synthetic_processed_data(num_items=num_items_arg, run_type="student_schedule_request")
+    num_checked_arg = check_fitness_equivalence(student_benchmark_data, run_type="student_schedule_request",
+                                                student_preferences=BENCHMARK_STUDENT_PREFERENCES)
+    print(f"GA_BENCHMARK: batch, delta and serial penalties agree on {num_checked_arg} student request individuals "
+          f"(preferences {sorted(BENCHMARK_STUDENT_PREFERENCES)}).", flush=True)
+
+    baseline_result = time_ga_generations(EagerCopyGeneticAlgorithmScheduler, benchmark_data, population_size_arg, generations_arg)
+    print_benchmark_row(baseline_result)
+    cow_result = time_ga_generations(GeneticAlgorithmScheduler, benchmark_data, population_size_arg, generations_arg,
+                                     use_batch_evaluation=False)
+    cow_result["scheduler"] += " (full evaluation)"
+    print_benchmark_row(cow_result, baseline_result)
+    batch_result = time_ga_generations(GeneticAlgorithmScheduler, benchmark_data, population_size_arg, generations_arg,
+                                       use_batch_evaluation=True)
+    batch_result["scheduler"] += " (batch evaluation)"
+    print_benchmark_row(batch_result, baseline_result)
+    pool_result = time_ga_generations(GeneticAlgorithmScheduler, benchmark_data, population_size_arg, generations_arg,
+                                      use_batch_evaluation=True, num_eval_workers=num_workers_arg)
+    pool_result["scheduler"] += f" (batch on {num_workers_arg} workers)"
+    print_benchmark_row(pool_result, baseline_result)
\ No newline at end of file
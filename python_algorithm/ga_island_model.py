@@ -0,0 +1,159 @@
+import random
+import multiprocessing
+import queue
+import traceback
+from functools import partial
+from typing import List, Dict, Tuple, Any, Optional
+
+from ga_module import GeneticAlgorithmScheduler, ScheduleChromosome, DiverseScheduleArchive
+
+
+def _log_from_island(progress_logger: Optional[callable], island_idx: int, message: str):
+    island_message = f"[Island {island_idx}] {message}"
+    if progress_logger: progress_logger(island_message)
+    else: print(island_message, flush=True)
+
+
+class _RingMigrationChannel:
+    """One island's link in the ring: sends to the next island, receives from the previous one.
+
+    An island that stops (generation limit, time limit, stall) sends None so its neighbour stops waiting for it.
+    """
+
+    def __init__(self, inbox: Any, outbox: Any, timeout_seconds: float):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.timeout_seconds = timeout_seconds
+        self.sender_finished = False
+
+    def __call__(self, emigrant_genes: List[Tuple[Any, Any, Any]]) -> List[Tuple[Any, Any, Any]]:
+        self.outbox.put(emigrant_genes)
+        if self.sender_finished: return []
+        try:
+            immigrant_genes = self.inbox.get(timeout=self.timeout_seconds)
+        except queue.Empty:
+            # The neighbour is slower; carry on without immigrants this round.
+            return []
+        if immigrant_genes is None:
+            self.sender_finished = True
+            return []
+        return immigrant_genes
+
+    def close(self):
+        self.outbox.put(None)
+        # Migrants a finished neighbour never collects must not keep this process from exiting.
+        self.outbox.cancel_join_thread()
+
+
+def _run_island(island_idx: int, processed_data: Dict[str, Any], initial_population_from_cp: List[List[Dict[str, Any]]],
+                scheduler_settings: Dict[str, Any], island_seed: int, inbox: Any, outbox: Any, result_queue: Any,
+                migration_timeout_seconds: float, progress_logger: Optional[callable]):
+    random.seed(island_seed)
+    migration_channel = _RingMigrationChannel(inbox, outbox, migration_timeout_seconds)
+    try:
+        island_scheduler = GeneticAlgorithmScheduler(
+            processed_data=processed_data, initial_population_from_cp=initial_population_from_cp,
+            progress_logger=partial(_log_from_island, progress_logger, island_idx),
+            migration_exchange=migration_channel,
+            **scheduler_settings
+        )
+        best_schedule, best_penalty, detailed_metrics = island_scheduler.run()
+        # Genes travel with each option so the parent can keep the options distinct across islands.
+        island_options = [
+            (option_penalty, (option_chromosome.rooms, option_chromosome.timeslots, option_chromosome.lecturers), option_schedule, option_metrics)
+            for (option_penalty, option_chromosome), (option_schedule, _, option_metrics)
+            in zip(island_scheduler.schedule_archive.entries, island_scheduler.schedule_options)
+        ] if island_scheduler.schedule_archive is not None else []
+        result_queue.put((island_idx, best_schedule, best_penalty, detailed_metrics, island_options))
+    except Exception as e_island:
+        _log_from_island(progress_logger, island_idx, f"GA ISLAND ERROR: {e_island}\n{traceback.format_exc()}")
+        result_queue.put((island_idx, None, float('inf'), {}, []))
+    finally:
+        migration_channel.close()
+
+
+class IslandModelGAScheduler:
+    """Runs independent GeneticAlgorithmScheduler islands in separate processes, migrating best individuals over a ring."""
+
+    def __init__(self,
+                 processed_data: Dict[str, Any],
+                 initial_population_from_cp: List[List[Dict[str, Any]]],
+                 num_islands: int = 4,
+                 migration_interval: int = 10,
+                 num_migrants: int = 2,
+                 base_seed: Optional[int] = None,
+                 migration_timeout_seconds: float = 60.0,
+                 progress_logger: Optional[callable] = None,
+                 **scheduler_settings):
+        self.processed_data = processed_data
+        self.initial_population_from_cp = initial_population_from_cp
+        self.num_islands = max(1, num_islands)
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.base_seed = base_seed if base_seed is not None else random.randrange(2 ** 31)
+        self.migration_timeout_seconds = migration_timeout_seconds
+        self.progress_logger = progress_logger
+        # Islands already run one per process; evaluation pools inside them would oversubscribe the cores.
+        self.scheduler_settings = dict(scheduler_settings, num_eval_workers=1,
+                                       migration_interval=migration_interval, num_migrants=num_migrants)
+        self.schedule_options: List[Tuple[List[Dict[str, Any]], float, Dict[str, Any]]] = []
+
+    def _log_islands(self, message: str):
+        prefix = "GA_ISLANDS"
+        if self.progress_logger:
+            self.progress_logger(f"{prefix}: {message}")
+        else:
+            print(f"{prefix}_STDOUT: {message}")
+
+    def _merge_schedule_options(self, island_options: List[Tuple[float, Tuple[Any, Any, Any], List[Dict[str, Any]], Dict[str, Any]]]
+                                ) -> List[Tuple[List[Dict[str, Any]], float, Dict[str, Any]]]:
+        return DiverseScheduleArchive.select_options(
+            self.scheduler_settings.get("num_schedule_options", 1), self.scheduler_settings.get("option_min_hamming_distance", 1),
+            [(option_penalty, ScheduleChromosome(*option_genes), (option_schedule, option_penalty, option_metrics))
+             for option_penalty, option_genes, option_schedule, option_metrics in island_options]
+        )
+
+    def run(self) -> Tuple[Optional[List[Dict[str, Any]]], float, Dict[str, Any]]:
+        self._log_islands(f"Starting {self.num_islands} islands (migration every {self.migration_interval} generations, "
+                          f"{self.num_migrants} migrants, base seed {self.base_seed}).")
+        island_inboxes = [multiprocessing.Queue() for _ in range(self.num_islands)]
+        result_queue = multiprocessing.Queue()
+        island_processes = []
+        for island_idx in range(self.num_islands):
+            island_process = multiprocessing.Process(
+                target=_run_island, name=f"ga_island_{island_idx}",
+                args=(island_idx, self.processed_data, self.initial_population_from_cp, self.scheduler_settings,
+                      self.base_seed + island_idx, island_inboxes[island_idx], island_inboxes[(island_idx + 1) % self.num_islands],
+                      result_queue, self.migration_timeout_seconds, self.progress_logger)
+            )
+            island_process.start()
+            island_processes.append(island_process)
+
+        island_results: Dict[int, Tuple[Optional[List[Dict[str, Any]]], float, Dict[str, Any]]] = {}
+        island_options: List[Tuple[float, Tuple[Any, Any, Any], List[Dict[str, Any]], Dict[str, Any]]] = []
+        while len(island_results) < self.num_islands:
+            try:
+                island_idx, best_schedule, best_penalty, detailed_metrics, options_from_island = result_queue.get(timeout=1.0)
+                island_results[island_idx] = (best_schedule, best_penalty, detailed_metrics)
+                island_options.extend(options_from_island)
+            except queue.Empty:
+                if not any(p.is_alive() for p in island_processes) and result_queue.empty():
+                    self._log_islands(f"WARN: {self.num_islands - len(island_results)} island(s) exited without a result.")
+                    break
+        for island_process in island_processes:
+            island_process.join()
+
+        best_island_idx = min(island_results, key=lambda idx: island_results[idx][1], default=None)
+        if best_island_idx is None or island_results[best_island_idx][0] is None:
+            self._log_islands("ERROR: No island produced a schedule.")
+            return None, float('inf'), {"final_penalty_score": float('inf'), "num_islands": self.num_islands}
+
+        best_schedule, best_penalty, best_metrics = island_results[best_island_idx]
+        best_metrics = dict(best_metrics)
+        best_metrics["num_islands"] = self.num_islands
+        best_metrics["best_island"] = best_island_idx
+        best_metrics["island_best_penalties"] = {idx: round(island_results[idx][1], 2) for idx in sorted(island_results)}
+        self.schedule_options = self._merge_schedule_options(island_options)
+        if self.schedule_options: best_metrics["num_schedule_options"] = len(self.schedule_options)
+        self._log_islands(f"Best penalty {best_penalty:.2f} from island {best_island_idx}.")
+        return best_schedule, best_penalty, best_metrics
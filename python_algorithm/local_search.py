@@ -0,0 +1,132 @@
+import math
+import random
+import time as pytime
+from array import array
+from typing import List, Dict, Tuple, Any, Optional
+
+from ga_module import GeneticAlgorithmScheduler, ScheduleChromosome, ScheduleFitnessState
+
+
+class LocalSearchOptimizer:
+    """Simulated-annealing post-optimization of one schedule, scored move by move through ScheduleFitnessState.
+
+    Neighbourhood: move one event to another timeslot, move one event to another suitable room, or swap the
+    timeslots of two events. Rejected moves are undone on the state, so no move costs a full fitness pass.
+    """
+
+    def __init__(self,
+                 scheduler: GeneticAlgorithmScheduler,
+                 time_limit_seconds: float = 5.0,
+                 max_iterations_without_improvement: int = 20000,
+                 initial_temperature: Optional[float] = None,
+                 final_temperature: float = 0.01,
+                 progress_logger: Optional[callable] = None):
+        self.scheduler = scheduler
+        self.time_limit_seconds = max(0.0, time_limit_seconds)
+        self.max_iterations_without_improvement = max(1, max_iterations_without_improvement)
+        self.initial_temperature = initial_temperature
+        self.final_temperature = max(1e-9, final_temperature)
+        self.progress_logger = progress_logger
+
+    def _log_ls(self, message: str):
+        prefix = "LOCAL_SEARCH"
+        if self.progress_logger:
+            self.progress_logger(f"{prefix}: {message}")
+        else:
+            print(f"{prefix}_STDOUT: {message}")
+
+    def _random_move(self, state: ScheduleFitnessState, placed_positions: List[int]) -> List[Tuple[int, str, int]]:
+        ga = self.scheduler
+        item_pos = random.choice(placed_positions)
+        move_kind = random.random()
+        if move_kind < 0.45:
+            new_ts_id = random.choice(ga.all_mapped_ts_ids)
+            return [(item_pos, "timeslots", new_ts_id)] if new_ts_id != state.timeslots[item_pos] else []
+        if move_kind < 0.75:
+            suitable_room_ids = ga.suitable_room_ids_by_item[item_pos] or ga.all_mapped_room_ids
+            new_room_id = random.choice(suitable_room_ids) if suitable_room_ids else -1
+            return [(item_pos, "rooms", new_room_id)] if new_room_id >= 0 and new_room_id != state.rooms[item_pos] else []
+        other_pos = random.choice(placed_positions)
+        if state.timeslots[other_pos] == state.timeslots[item_pos]: return []
+        return [(item_pos, "timeslots", state.timeslots[other_pos]), (other_pos, "timeslots", state.timeslots[item_pos])]
+
+    def _apply_moves(self, state: ScheduleFitnessState, moves: List[Tuple[int, str, int]]) -> List[Tuple[int, str, int]]:
+        undo_moves = []
+        for item_pos, gene_name, value in moves:
+            undo_moves.append((item_pos, gene_name, getattr(state, gene_name)[item_pos]))
+            state.apply_move(item_pos, gene_name, value)
+        undo_moves.reverse()
+        return undo_moves
+
+    def _estimate_initial_temperature(self, state: ScheduleFitnessState, placed_positions: List[int], current_penalty: float) -> float:
+        # Mean worsening of a few random moves, so roughly half of the typical uphill moves are accepted at the start.
+        worsening_deltas = []
+        for _ in range(50):
+            moves = self._random_move(state, placed_positions)
+            if not moves: continue
+            undo_moves = self._apply_moves(state, moves)
+            move_penalty = state.penalty()
+            self._apply_moves(state, undo_moves)
+            if current_penalty < move_penalty < float('inf'): worsening_deltas.append(move_penalty - current_penalty)
+        return (sum(worsening_deltas) / len(worsening_deltas)) / math.log(2) if worsening_deltas else 1.0
+
+    def optimize(self, schedule: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], float, Dict[str, Any]]:
+        ga = self.scheduler
+        run_start_time = pytime.perf_counter()
+        state = ScheduleFitnessState(ga, ga._encode_schedule(schedule))
+        placed_positions = [item_pos for item_pos, ts_id in enumerate(state.timeslots) if ts_id >= 0]
+        current_penalty = initial_penalty = state.penalty()
+        summary: Dict[str, Any] = {
+            "initial_penalty": round(initial_penalty, 2), "iterations": 0, "accepted_moves": 0, "improving_moves": 0,
+            "time_limit_seconds": self.time_limit_seconds
+        }
+        if not placed_positions or not ga.all_mapped_ts_ids or self.time_limit_seconds <= 0:
+            summary.update({"final_penalty": summary["initial_penalty"], "stop_reason": "nothing_to_optimize", "elapsed_seconds": 0.0})
+            return schedule, initial_penalty, summary
+
+        best_penalty = current_penalty
+        best_genes = (array('i', state.rooms), array('i', state.timeslots), array('i', state.lecturers))
+        start_temperature = self.initial_temperature or self._estimate_initial_temperature(state, placed_positions, current_penalty)
+        temperature = start_temperature
+        iterations_since_best = 0
+        stop_reason = "time_limit"
+        while True:
+            if summary["iterations"] % 256 == 0:
+                elapsed_fraction = (pytime.perf_counter() - run_start_time) / self.time_limit_seconds
+                if elapsed_fraction >= 1.0: break
+                # Geometric cooling over the time budget.
+                temperature = start_temperature * (self.final_temperature / start_temperature) ** elapsed_fraction \
+                    if start_temperature > self.final_temperature else self.final_temperature
+            if best_penalty <= ga.penalty_lower_bound + 1e-9:
+                stop_reason = "reached_lower_bound"; break
+            if iterations_since_best >= self.max_iterations_without_improvement:
+                stop_reason = "stalled"; break
+            summary["iterations"] += 1
+            iterations_since_best += 1
+
+            moves = self._random_move(state, placed_positions)
+            if not moves: continue
+            undo_moves = self._apply_moves(state, moves)
+            move_penalty = state.penalty()
+            penalty_delta = move_penalty - current_penalty
+            if move_penalty < float('inf') and (penalty_delta <= 0 or random.random() < math.exp(-penalty_delta / temperature)):
+                current_penalty = move_penalty
+                summary["accepted_moves"] += 1
+                if penalty_delta < 0: summary["improving_moves"] += 1
+                if current_penalty < best_penalty - 1e-9:
+                    best_penalty = current_penalty
+                    best_genes = (array('i', state.rooms), array('i', state.timeslots), array('i', state.lecturers))
+                    iterations_since_best = 0
+            else:
+                self._apply_moves(state, undo_moves)
+
+        best_chromosome = ScheduleChromosome(*best_genes)
+        summary.update(ga._calculate_detailed_metrics(best_chromosome, best_penalty))
+        summary.update({
+            "final_penalty": round(best_penalty, 2), "stop_reason": stop_reason,
+            "elapsed_seconds": round(pytime.perf_counter() - run_start_time, 3)
+        })
+        self._log_ls(f"{summary['iterations']} iterations, {summary['accepted_moves']} accepted; penalty "
+                     f"{initial_penalty:.2f} -> {best_penalty:.2f} ({stop_reason}).")
+        if best_penalty >= initial_penalty: return schedule, initial_penalty, summary
+        return ga._decode_chromosome(best_chromosome), best_penalty, summary